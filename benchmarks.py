@@ -0,0 +1,343 @@
+"""Benchmarks for the rendering and physics hot paths of both games
+
+Runs headless under SDL's dummy video driver. Results are written as JSON
+and can be compared against a stored baseline:
+
+    python benchmarks.py --output results.json
+    python benchmarks.py --baseline results.json --threshold 0.2
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Run without opening a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+import pong_game
+from racing_fleet import CarFleet
+from racing_game import Camera, Car, RacingGame, Track, Vector3
+from racing_sim import FIXED_DT, THROTTLE
+from telemetry import TelemetryBuffer
+
+# Imports a game module and draws its first frame in a fresh interpreter
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+{module}.{game}().draw()
+print(imported - start, time.perf_counter() - start)
+"""
+
+TRACK_SIZES = (len(Track().segments), 500, 5000)  # The built-in track, then generated loops
+CAR_COUNTS = (1, 100, 10000)
+SEED = 1234
+
+
+def make_track(segments):
+    """Build a closed, hilly loop with the given number of segments"""
+    if segments == len(Track().segments):
+        return Track()
+
+    rng = random.Random(SEED)
+    radius = segments * 6 / (2 * math.pi)
+    points = []
+    for i in range(segments):
+        angle = 2 * math.pi * i / segments
+        wobble = 1 + 0.1 * math.sin(angle * 7)
+        points.append(Vector3(
+            math.sin(angle) * radius * wobble,
+            max(0.0, 6 * math.sin(angle * 5) + rng.uniform(0, 1)),
+            (1 - math.cos(angle)) * radius * wobble
+        ))
+    points.append(Vector3(0, 0, 0))
+    track = Track()
+    track.set_points(points)
+    return track
+
+
+def time_per_op(func, ops=1, min_time=0.2, repeats=5):
+    """Best-of-`repeats` seconds per operation for func, which performs `ops` operations"""
+    func()  # Warm up caches
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - start >= min_time / repeats or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    # Keep garbage collection pauses out of the measurement, as timeit does
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(loops):
+                func()
+            best = min(best, (time.perf_counter() - start) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best / ops
+
+
+def allocations_per_call(func, calls=50):
+    """Memory blocks still alive per call of func, measured with tracemalloc"""
+    tracemalloc.start()
+    # Warm up while tracing, so caches refilled once tracing starts are not counted as growth
+    for _ in range(calls):
+        func()
+    before = tracemalloc.take_snapshot()
+    results = [func() for _ in range(calls)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del results
+    return blocks / calls
+
+
+def peak_bytes_per_call(func):
+    """Most memory held at once while func runs, above what was held before it"""
+    func()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - before
+
+
+def follow_camera(track, progress=0.3):
+    """Camera placed behind a car partway round the track, as in RacingGame.update"""
+    car = Car(track)
+    car.progress = progress
+    position, angle, _ = track.get_position_on_track(progress)
+    camera = Camera()
+    camera.position = Vector3(position.x, position.y - 5, position.z - 20)
+    camera.rotation = angle
+    return camera, car
+
+
+def bench_camera(results):
+    track = make_track(TRACK_SIZES[0])
+    camera, _ = follow_camera(track)
+    points = track.geometry.points
+    vectors = [Vector3(*p) for p in points.tolist()]
+
+    def project_each():
+        for v in vectors:
+            camera.project(v)
+
+    results['camera.project'] = {
+        'points': len(vectors),
+        'seconds_per_op': time_per_op(project_each, len(vectors)),
+    }
+    results['camera.project_points'] = {
+        'points': len(points),
+        'seconds_per_op': time_per_op(lambda: camera.project_points(points), len(points)),
+    }
+
+
+def bench_track(results):
+    for size in TRACK_SIZES:
+        track = make_track(size)
+        segments = track.segments
+
+        def corners():
+            return [segment.get_corners() for segment in segments]
+
+        results[f'segment.get_corners[{size}]'] = {
+            'segments': size,
+            'seconds_per_op': time_per_op(corners, size),
+            'allocations_per_frame': allocations_per_call(corners, 10),
+        }
+
+        progress = np.random.default_rng(SEED).random(1000).tolist()
+
+        def lookups():
+            for p in progress:
+                track.get_position_on_track(p)
+
+        results[f'track.get_position_on_track[{size}]'] = {
+            'segments': size,
+            'seconds_per_op': time_per_op(lookups, len(progress)),
+        }
+
+
+def bench_car(results):
+    track = make_track(TRACK_SIZES[0])
+    car = Car(track)
+    results['car.update'] = {
+        'seconds_per_op': time_per_op(lambda: car.update(FIXED_DT, THROTTLE), 1),
+        'allocations_per_frame': allocations_per_call(lambda: car.update(FIXED_DT, THROTTLE)),
+        'peak_bytes_per_frame': peak_bytes_per_call(lambda: car.update(FIXED_DT, THROTTLE)),
+    }
+    recording = Car(track)
+    recording.telemetry = TelemetryBuffer()
+    results['car.update+telemetry'] = {
+        'seconds_per_op': time_per_op(lambda: recording.update(FIXED_DT, THROTTLE), 1),
+        'allocations_per_frame': allocations_per_call(lambda: recording.update(FIXED_DT, THROTTLE)),
+    }
+    results['car.get_corners'] = {
+        'seconds_per_op': time_per_op(car.get_corners),
+        'allocations_per_frame': allocations_per_call(car.get_corners),
+    }
+    for count in CAR_COUNTS:
+        fleet = CarFleet(track, count)
+        results[f'fleet.update[{count}]'] = {
+            'cars': count,
+            'seconds_per_op': time_per_op(lambda: fleet.update(FIXED_DT, THROTTLE), count),
+            'seconds_per_tick': time_per_op(lambda: fleet.update(FIXED_DT, THROTTLE)),
+        }
+
+
+def bench_draw_track(results):
+    game = RacingGame()
+    for size in TRACK_SIZES:
+        game.track = make_track(size)
+        game.camera, _ = follow_camera(game.track)
+        
+        def draw_track():
+            game.draw_track()
+            game.render_queue.flush(game.screen)
+        
+        results[f'racing.draw_track[{size}]'] = {
+            'segments': size,
+            'seconds_per_frame': time_per_op(draw_track),
+            'allocations_per_frame': allocations_per_call(draw_track, 10),
+            'peak_bytes_per_frame': peak_bytes_per_call(draw_track),
+        }
+
+
+def bench_pong(results):
+    sim = pong_game.PongSimulation(left_ai=pong_game.FollowBall(), rng=random.Random(SEED))
+    results['pong.step'] = {
+        'seconds_per_op': time_per_op(sim.step),
+    }
+    paddles = (sim.player_paddle, sim.ai_paddle)
+    results['pong.ball.move'] = {
+        'seconds_per_op': time_per_op(lambda: (sim.ball.move(paddles), sim.check_collisions())),
+    }
+
+
+def cold_start(module, game, runs=3):
+    """Best (import, first frame) seconds for a game over several fresh interpreters"""
+    script = STARTUP_SCRIPT.format(module=module, game=game)
+    directory = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', script], cwd=directory, check=True,
+                                capture_output=True, text=True).stdout
+        timings.append(tuple(float(value) for value in output.split()[-2:]))
+    return min(timings, key=lambda timing: timing[1])
+
+
+def bench_startup(results):
+    for module, game in (('pong_game', 'PongGame'), ('racing_game', 'RacingGame')):
+        import_seconds, first_frame_seconds = cold_start(module, game)
+        results[f'startup.{module}'] = {
+            'import_seconds': import_seconds,
+            'seconds_to_first_frame': first_frame_seconds,
+        }
+
+
+BENCHMARKS = {
+    'camera': bench_camera,
+    'track': bench_track,
+    'car': bench_car,
+    'draw_track': bench_draw_track,
+    'pong': bench_pong,
+    'startup': bench_startup,
+}
+
+TIMING_KEYS = ('seconds_per_op', 'seconds_per_frame', 'seconds_per_tick', 'allocations_per_frame',
+               'peak_bytes_per_frame', 'import_seconds', 'seconds_to_first_frame')
+
+
+def run(selected):
+    random.seed(SEED)
+    results = {}
+    for name in selected:
+        BENCHMARKS[name](results)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print each metric against the baseline; return the names that regressed"""
+    regressions = []
+    for name, metrics in sorted(current['results'].items()):
+        previous = baseline['results'].get(name, {})
+        for key in TIMING_KEYS:
+            if key not in metrics or key not in previous:
+                continue
+            new, old = metrics[key], previous[key]
+            change = (new - old) / old if old else (0.0 if new == old else float('inf'))
+            flag = ''
+            # Tiny allocation counts are noise; require at least one extra block
+            if change > threshold and not (key == 'allocations_per_frame' and new - old < 1):
+                flag = '  REGRESSION'
+                regressions.append(f"{name}.{key}")
+            print(f"{name:40s} {key:22s} {old:12.4g} -> {new:12.4g} ({change:+.1%}){flag}")
+    return regressions
+
+
+def report(current):
+    for name, metrics in sorted(current['results'].items()):
+        values = "  ".join(f"{key}={metrics[key]:.4g}" for key in TIMING_KEYS if key in metrics)
+        print(f"{name:40s} {values}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=sorted(BENCHMARKS),
+                        help="benchmark groups to run")
+    parser.add_argument('--output', metavar='PATH', help="write results as JSON")
+    parser.add_argument('--baseline', metavar='PATH', help="compare against a stored JSON result")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="relative slowdown that counts as a regression (default 0.2)")
+    args = parser.parse_args(argv)
+
+    current = run(args.only)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print("No regressions")
+    else:
+        report(current)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
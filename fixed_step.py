@@ -0,0 +1,31 @@
+class FixedTimestep:
+    """Turns variable frame times into a whole number of fixed simulation ticks
+
+    Call advance() once per rendered frame with the frame's duration and run
+    the returned number of ticks of length dt. alpha is then how far the
+    display lies between the last two ticks, for interpolating what is drawn.
+    At most max_steps ticks run per frame; time beyond that is dropped, so a
+    long stall slows the game down instead of snowballing.
+    """
+    def __init__(self, dt, max_steps=5):
+        self.dt = dt
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        """Add a frame's duration in seconds; returns how many ticks to run"""
+        self.accumulator += frame_time
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = steps * self.dt
+        self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        """Fraction of a tick elapsed since the last one, for render interpolation"""
+        return min(1.0, self.accumulator / self.dt)
+
+    def reset(self):
+        self.accumulator = 0.0
@@ -0,0 +1,132 @@
+import csv
+import json
+import time
+from collections import deque
+
+FRAME = 'frame'
+
+
+class _NullScope:
+    """Context manager used while profiling is disabled"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class FrameProfiler:
+    """Named per-frame timing scopes with rolling percentiles and trace export
+
+    Wrap each phase of the game loop in `with profiler.scope("update"):` and
+    bracket frames with begin_frame()/end_frame(). While disabled, scope()
+    returns a shared no-op context manager so the loop pays almost nothing.
+    """
+    def __init__(self, enabled=False, window=300, max_trace_frames=100000):
+        self.enabled = enabled
+        self.overlay_visible = False
+        self.window = window
+        self.max_trace_frames = max_trace_frames
+        self.samples = {}
+        self.trace = []
+        self.frame_index = 0
+        self._frame = {}
+        self._frame_start = None
+
+    def toggle_overlay(self):
+        """Show or hide the overlay, enabling profiling when it is shown"""
+        self.overlay_visible = not self.overlay_visible
+        if self.overlay_visible:
+            self.enabled = True
+
+    def scope(self, name):
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def add(self, name, seconds):
+        """Record time spent in a named phase of the current frame"""
+        self._frame[name] = self._frame.get(name, 0.0) + seconds
+
+    def begin_frame(self):
+        if self.enabled:
+            self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None:
+            return
+        self._frame[FRAME] = time.perf_counter() - self._frame_start
+        self._frame_start = None
+
+        for name, seconds in self._frame.items():
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+        if len(self.trace) < self.max_trace_frames:
+            self.trace.append((self.frame_index, self._frame))
+        self._frame = {}
+        self.frame_index += 1
+
+    def percentiles(self, name=FRAME, points=(50, 95, 99)):
+        """Rolling percentiles of a phase in milliseconds, or None without samples"""
+        samples = self.samples.get(name)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return tuple(ordered[min(last, int(round(p / 100 * last)))] * 1000 for p in points)
+
+    def summary_lines(self):
+        lines = []
+        for name in sorted(self.samples, key=lambda n: (n != FRAME, n)):
+            p50, p95, p99 = self.percentiles(name)
+            lines.append(f"{name:>10s} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        return lines
+
+    def draw_overlay(self, screen, text_cache, font, color, position=(10, 10)):
+        """Draw p50/p95/p99 milliseconds for every phase, if the overlay is visible"""
+        if not self.overlay_visible:
+            return
+        x, y = position
+        text_cache.blit(screen, font, "     phase    p50    p95    p99 (ms)", color, (x, y))
+        for line in self.summary_lines():
+            y += font.get_linesize()
+            text_cache.blit_glyphs(screen, font, line, color, (x, y))
+
+    def export(self, path):
+        """Write the per-frame trace to a .json or .csv file"""
+        names = sorted({name for _, frame in self.trace for name in frame})
+        if str(path).endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({
+                    'phases': names,
+                    'frames_ms': [
+                        dict({name: seconds * 1000 for name, seconds in frame.items()}, index=index)
+                        for index, frame in self.trace
+                    ],
+                    'percentiles_ms': {name: self.percentiles(name) for name in self.samples},
+                }, f, indent=1)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['frame'] + [f"{name}_ms" for name in names])
+                for index, frame in self.trace:
+                    writer.writerow([index] + [f"{frame.get(name, 0.0) * 1000:.4f}" for name in names])
@@ -0,0 +1,93 @@
+"""Predictive Pong AI that solves where the ball will meet its paddle
+
+The intercept is solved in closed form, folding top and bottom wall
+bounces into a single reflection, and only when the ball's velocity changes
+(a serve or any bounce). Every other tick is a comparison against the cached
+target, so the AI costs the same per tick whatever the difficulty.
+"""
+import random
+
+from pong_game import BALL_SIZE, PADDLE_SPEED, SCREEN_HEIGHT, SCREEN_WIDTH
+
+# reaction_ticks: delay before reacting to a new trajectory
+# error: largest aiming error in pixels, drawn once per trajectory
+DIFFICULTY_LEVELS = {
+    'easy': dict(speed=5, reaction_ticks=20, error=90),
+    'medium': dict(speed=6, reaction_ticks=10, error=60),
+    'hard': dict(speed=7, reaction_ticks=4, error=25),
+    'perfect': dict(speed=7, reaction_ticks=0, error=0),
+}
+
+
+def intercept_y(y, speed_y, ticks):
+    """Ball top after `ticks` ticks, reflecting off the top and bottom walls"""
+    span = SCREEN_HEIGHT - BALL_SIZE
+    if span <= 0:
+        return 0.0
+    # Unfold the walls into a repeating band, then fold the position back
+    travelled = (y + speed_y * ticks) % (2 * span)
+    return travelled if travelled <= span else 2 * span - travelled
+
+
+class PredictiveAI:
+    """Moves the paddle to where the ball will arrive instead of chasing it
+
+    Callable like FollowBall: (paddle, ball) -> paddle speed. While the ball
+    heads away the paddle returns to the middle.
+    """
+    def __init__(self, speed=PADDLE_SPEED, reaction_ticks=0, error=0, dead_zone=3, rng=None):
+        self.speed = speed
+        self.reaction_ticks = reaction_ticks
+        self.error = error
+        self.dead_zone = dead_zone
+        self.rng = rng if rng is not None else random.Random()
+        self.solves = 0
+        self.reset()
+
+    def reset(self, rng=None):
+        """Forget the current trajectory before a new match; aiming errors then come from rng if given"""
+        if rng is not None:
+            self.rng = rng
+        self.velocity = None
+        self.target = SCREEN_HEIGHT / 2
+        self.next_target = self.target
+        self.wait = 0
+
+    @classmethod
+    def level(cls, name, rng=None):
+        """AI configured for one of DIFFICULTY_LEVELS"""
+        return cls(rng=rng, **DIFFICULTY_LEVELS[name])
+
+    def solve(self, paddle, ball):
+        """Paddle centre y to aim for on the ball's current trajectory"""
+        self.solves += 1
+        on_right = paddle.rect.centerx > SCREEN_WIDTH / 2
+        approaching = ball.speed_x > 0 if on_right else ball.speed_x < 0
+        if not approaching:
+            return SCREEN_HEIGHT / 2
+
+        contact_x = paddle.rect.left - BALL_SIZE if on_right else paddle.rect.right
+        ticks = max(0.0, (contact_x - ball.x) / ball.speed_x)
+        target = intercept_y(ball.y, ball.speed_y, ticks) + BALL_SIZE / 2
+        if self.error:
+            target += self.rng.uniform(-self.error, self.error)
+        return target
+
+    def __call__(self, paddle, ball):
+        # A new velocity means a serve or a bounce: solve once and react after a delay
+        velocity = (ball.speed_x, ball.speed_y)
+        if velocity != self.velocity:
+            self.velocity = velocity
+            self.next_target = self.solve(paddle, ball)
+            self.wait = self.reaction_ticks
+        if self.wait > 0:
+            self.wait -= 1
+        else:
+            self.target = self.next_target
+
+        offset = int(self.target - paddle.rect.centery)
+        if offset > self.dead_zone:
+            return min(self.speed, offset)
+        elif offset < -self.dead_zone:
+            return max(-self.speed, offset)
+        return 0
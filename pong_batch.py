@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from pong_game import FollowBall, PongSimulation
+
+POINTS_TO_WIN = 5
+MAX_TICKS = 36000  # Ten minutes of play at 60 ticks per second
+
+
+def play_match(left_ai, right_ai, seed, points_to_win=POINTS_TO_WIN, max_ticks=MAX_TICKS):
+    """Play one headless AI-vs-AI match; returns (left_score, right_score, ticks)"""
+    rng = random.Random(seed)
+    # AIs that draw random numbers get streams derived from the match seed, so matches replay exactly
+    for ai in (left_ai, right_ai):
+        if hasattr(ai, 'reset'):
+            ai.reset(random.Random(rng.random()))
+    sim = PongSimulation(left_ai, right_ai, rng=rng)
+    sim.ball.reset(sim.rng)
+    while sim.ticks < max_ticks and max(sim.player_score, sim.ai_score) < points_to_win:
+        sim.step()
+    return sim.player_score, sim.ai_score, sim.ticks
+
+
+def _play_chunk(left_ai, right_ai, seeds, points_to_win, max_ticks):
+    return [play_match(left_ai, right_ai, seed, points_to_win, max_ticks) for seed in seeds]
+
+
+def run_batch(left_ai, right_ai, matches, points_to_win=POINTS_TO_WIN,
+              max_ticks=MAX_TICKS, workers=None, seed=0):
+    """Play many matches across a process pool; returns match results in seed order
+
+    Matches are split into one chunk per worker so each process pays the
+    task overhead once. AI callables must be picklable.
+    """
+    workers = workers or os.cpu_count()
+    seeds = list(range(seed, seed + matches))
+    chunks = [seeds[i::workers] for i in range(workers) if seeds[i::workers]]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_play_chunk, left_ai, right_ai, chunk, points_to_win, max_ticks)
+                   for chunk in chunks]
+        # Interleave the chunks back into seed order, so results do not depend on the worker count
+        results = [None] * matches
+        for i, future in enumerate(futures):
+            results[i::workers] = future.result()
+    return results
+
+
+def summarize(results, elapsed):
+    """Print score distribution, win rates and throughput for a batch"""
+    scores = Counter((left, right) for left, right, _ in results)
+    left_wins = sum(1 for left, right, _ in results if left > right)
+    right_wins = sum(1 for left, right, _ in results if right > left)
+    ticks = sum(t for _, _, t in results)
+
+    print(f"{len(results)} matches in {elapsed:.2f}s "
+          f"({len(results) / elapsed:.0f} matches/s, {ticks / elapsed:,.0f} ticks/s)")
+    print(f"Left wins {left_wins / len(results):.1%}  Right wins {right_wins / len(results):.1%}  "
+          f"Unfinished {(len(results) - left_wins - right_wins) / len(results):.1%}")
+    for (left, right), count in scores.most_common(10):
+        print(f"  {left}-{right}: {count}")
+
+
+def main(matches=1000):
+    left_ai = FollowBall(speed=4)
+    right_ai = FollowBall()
+    start = time.perf_counter()
+    results = run_batch(left_ai, right_ai, matches)
+    summarize(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
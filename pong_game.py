@@ -1,8 +1,11 @@
 import pygame
+import argparse
 import sys
 
-# Initialize Pygame
-pygame.init()
+from fixed_step import FixedTimestep
+from frame_profiler import FrameProfiler
+from pygame_setup import get_font, init_display
+from text_cache import TextCache
 
 # Constants
 SCREEN_WIDTH = 800
@@ -16,6 +19,20 @@ BALL_SPEED_Y = 5
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 FPS = 60
+MAX_BOUNCES = 4  # Collisions resolved per ball move
+
+def swept_entry(position, size, delta, low, high):
+    """Entry and exit fractions of a moving span [position, position + size] over [low, high]
+    
+    Returns None if the span never overlaps the interval during the move.
+    """
+    if delta > 0:
+        return (low - (position + size)) / delta, (high - position) / delta
+    if delta < 0:
+        return (high - position) / delta, (low - (position + size)) / delta
+    if position < high and position + size > low:
+        return float('-inf'), float('inf')
+    return None
 
 class Paddle:
     def __init__(self, x, y):
@@ -38,41 +55,214 @@ class Ball:
         self.rect = pygame.Rect(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, BALL_SIZE, BALL_SIZE)
         self.speed_x = BALL_SPEED_X
         self.speed_y = BALL_SPEED_Y
+        # Exact position of the top-left corner; rect holds the rounded copy
+        self.x = float(self.rect.x)
+        self.y = float(self.rect.y)
     
-    def move(self):
-        self.rect.x += self.speed_x
-        self.rect.y += self.speed_y
+    def move(self, paddles=(), dt=1.0):
+        """Sweep the ball along its velocity, bouncing at the exact time of impact
+        
+        Walls and paddles are tested continuously over the whole step, so fast
+        balls cannot tunnel through a paddle and several bounces can happen in
+        one call.
+        """
+        self.leave_overlapping(paddles)
         
-        # Bounce off top and bottom walls
-        if self.rect.top <= 0 or self.rect.bottom >= SCREEN_HEIGHT:
-            self.speed_y *= -1
+        remaining = dt
+        for _ in range(MAX_BOUNCES):
+            dx = self.speed_x * remaining
+            dy = self.speed_y * remaining
+            impact, axis = self.first_impact(dx, dy, paddles)
+            if impact is None:
+                break
+            
+            # Advance to the contact point and reflect
+            self.x += dx * impact
+            self.y += dy * impact
+            remaining -= remaining * impact
+            if axis == 'x':
+                self.speed_x *= -1
+            else:
+                self.speed_y *= -1
+        else:
+            dx = self.speed_x * remaining
+            dy = self.speed_y * remaining
+        
+        self.x += dx
+        self.y += dy
+        self.rect.x = round(self.x)
+        self.rect.y = round(self.y)
     
-    def reset(self):
+    def first_impact(self, dx, dy, paddles):
+        """Return (fraction of the move, axis) of the earliest collision, or (None, None)"""
+        impact, axis = None, None
+        
+        # Top and bottom walls
+        if dy < 0:
+            impact, axis = max(0.0, -self.y / dy), 'y'
+        elif dy > 0:
+            impact, axis = max(0.0, (SCREEN_HEIGHT - BALL_SIZE - self.y) / dy), 'y'
+        if impact is not None and impact > 1:
+            impact, axis = None, None
+        
+        for paddle in paddles:
+            rect = paddle.rect
+            x_span = swept_entry(self.x, BALL_SIZE, dx, rect.left, rect.right)
+            y_span = swept_entry(self.y, BALL_SIZE, dy, rect.top, rect.bottom)
+            if x_span is None or y_span is None:
+                continue
+            (x_entry, x_exit), (y_entry, y_exit) = x_span, y_span
+            entry = max(x_entry, y_entry)
+            if entry > min(x_exit, y_exit) or entry < 0 or entry > 1:
+                continue
+            if impact is None or entry < impact:
+                impact, axis = entry, ('x' if x_entry >= y_entry else 'y')
+        return impact, axis
+    
+    def leave_overlapping(self, paddles):
+        """If a paddle moved onto the ball, point the ball away from it once"""
+        for paddle in paddles:
+            rect = paddle.rect
+            if (self.x < rect.right and self.x + BALL_SIZE > rect.left and
+                    self.y < rect.bottom and self.y + BALL_SIZE > rect.top):
+                moving_left = self.speed_x < 0
+                left_of_center = self.x + BALL_SIZE / 2 < rect.centerx
+                if moving_left != left_of_center:
+                    self.speed_x *= -1
+    
+    def reset(self, rng=None):
+        """Serve from the center; with an rng the serve height and direction vary"""
         self.rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
         self.speed_x *= -1
         self.speed_y = BALL_SPEED_Y
+        if rng is not None:
+            self.rect.centery = rng.randint(SCREEN_HEIGHT // 4, 3 * SCREEN_HEIGHT // 4)
+            self.speed_y *= rng.choice((-1, 1))
+        self.x = float(self.rect.x)
+        self.y = float(self.rect.y)
     
     def draw(self, screen):
         pygame.draw.rect(screen, WHITE, self.rect)
 
-class PongGame:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Pong Game")
-        self.clock = pygame.time.Clock()
-        
+class FollowBall:
+    """Simple AI: follow the ball, ignoring offsets smaller than dead_zone"""
+    def __init__(self, speed=PADDLE_SPEED, dead_zone=0):
+        self.speed = speed
+        self.dead_zone = dead_zone
+    
+    def __call__(self, paddle, ball):
+        offset = ball.rect.centery - paddle.rect.centery
+        if offset > self.dead_zone:
+            return self.speed
+        elif offset < -self.dead_zone:
+            return -self.speed
+        return 0
+
+class PongSimulation:
+    """Pong rules without a display: paddles, ball, AI and scoring
+    
+    left_ai and right_ai are callables taking (paddle, ball) and returning
+    a paddle speed. A side without an AI keeps whatever speed it was given.
+    """
+    def __init__(self, left_ai=None, right_ai=None, rng=None):
         # Create paddles and ball
         self.player_paddle = Paddle(30, SCREEN_HEIGHT // 2 - PADDLE_HEIGHT // 2)
         self.ai_paddle = Paddle(SCREEN_WIDTH - 30 - PADDLE_WIDTH, SCREEN_HEIGHT // 2 - PADDLE_HEIGHT // 2)
         self.ball = Ball()
+        self.left_ai = left_ai
+        self.right_ai = right_ai if right_ai is not None else FollowBall()
+        self.rng = rng
         
         # Scores
         self.player_score = 0
         self.ai_score = 0
+        self.ticks = 0
+    
+    def update_ai(self):
+        if self.left_ai is not None:
+            self.player_paddle.speed = self.left_ai(self.player_paddle, self.ball)
+        if self.right_ai is not None:
+            self.ai_paddle.speed = self.right_ai(self.ai_paddle, self.ball)
+    
+    def check_collisions(self):
+        # Paddle and wall bounces are resolved continuously inside Ball.move
+        
+        # Check if ball goes out of bounds (scoring)
+        if self.ball.rect.left <= 0:
+            self.ai_score += 1
+            self.ball.reset(self.rng)
+        elif self.ball.rect.right >= SCREEN_WIDTH:
+            self.player_score += 1
+            self.ball.reset(self.rng)
+    
+    def step(self):
+        """Advance the match by one tick"""
+        self.update_ai()
+        
+        # Move objects
+        self.player_paddle.move()
+        self.ai_paddle.move()
+        self.ball.move((self.player_paddle, self.ai_paddle))
+        
+        # Check collisions
+        self.check_collisions()
+        self.ticks += 1
+
+class PongGame(PongSimulation):
+    MOVING = ('player_paddle', 'ai_paddle', 'ball')
+    
+    def __init__(self, dirty_rects=False, profile_path=None, max_fps=FPS, right_ai=None):
+        super().__init__(right_ai=right_ai)
+        init_display()
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Pong Game")
+        self.clock = pygame.time.Clock()
         
         # Font for score display
-        self.font = pygame.font.Font(None, 74)
-        self.small_font = pygame.font.Font(None, 36)
+        self.font = get_font(74)
+        self.small_font = get_font(36)
+        self.text_cache = TextCache()
+        
+        # Dirty-rect rendering: redraw and push only the regions that changed
+        self.dirty_rects = dirty_rects
+        self.full_redraw = True
+        self.previous_rects = {}
+        
+        # Frame profiling (F3 toggles the overlay; a trace is saved on exit if requested)
+        self.profile_path = profile_path
+        self.profiler = FrameProfiler(enabled=profile_path is not None)
+        self.profiler_font = get_font(20)
+        
+        # The match ticks at FPS whatever the frame rate (max_fps, 0 for no
+        # limit); paddles and ball are drawn between their last two tick positions
+        self.timestep = FixedTimestep(1.0 / FPS)
+        self.max_fps = max_fps
+        self.previous_positions = self.positions()
+        self.render_rects = {name: getattr(self, name).rect.copy() for name in self.MOVING}
+    
+    def positions(self):
+        """Exact top-left positions of the paddles and ball after the last tick"""
+        return {
+            'player_paddle': self.player_paddle.rect.topleft,
+            'ai_paddle': self.ai_paddle.rect.topleft,
+            'ball': (self.ball.x, self.ball.y),
+        }
+    
+    def interpolate(self, alpha):
+        """Place render_rects alpha of the way from the previous tick to the current one"""
+        current = self.positions()
+        for name, (x, y) in current.items():
+            previous_x, previous_y = self.previous_positions[name]
+            rect = self.render_rects[name]
+            rect.x = round(previous_x + (x - previous_x) * alpha)
+            rect.y = round(previous_y + (y - previous_y) * alpha)
+    
+    def step(self):
+        scores = (self.player_score, self.ai_score)
+        super().step()
+        if (self.player_score, self.ai_score) != scores:
+            # The ball was served again; don't draw it sweeping back from the goal
+            self.previous_positions = self.positions()
     
     def handle_input(self):
         keys = pygame.key.get_pressed()
@@ -85,81 +275,136 @@ class PongGame:
         else:
             self.player_paddle.speed = 0
     
-    def update_ai(self):
-        # Simple AI: follow the ball
-        if self.ai_paddle.rect.centery < self.ball.rect.centery:
-            self.ai_paddle.speed = PADDLE_SPEED
-        elif self.ai_paddle.rect.centery > self.ball.rect.centery:
-            self.ai_paddle.speed = -PADDLE_SPEED
+    def frame_rects(self):
+        """Screen region and content of everything that can change between frames
+        
+        Scores are keyed on their text as well as their rect: every digit
+        renders the same size, so a new score can leave the rect unchanged.
+        """
+        player_score = str(self.player_score)
+        ai_score = str(self.ai_score)
+        player_surface = self.text_cache.render(self.font, player_score, WHITE)
+        ai_surface = self.text_cache.render(self.font, ai_score, WHITE)
+        return {
+            'player_paddle': (self.render_rects['player_paddle'].copy(), None),
+            'ai_paddle': (self.render_rects['ai_paddle'].copy(), None),
+            'ball': (self.render_rects['ball'].copy(), None),
+            'player_score': (player_surface.get_rect(topleft=(SCREEN_WIDTH // 4, 20)), player_score),
+            'ai_score': (ai_surface.get_rect(topleft=(3 * SCREEN_WIDTH // 4, 20)), ai_score),
+        }
+    
+    def draw(self, alpha=1.0):
+        self.interpolate(alpha)
+        
+        # The profiler overlay is not tracked as a dirty region, so it forces full redraws
+        if self.dirty_rects and not self.full_redraw and not self.profiler.overlay_visible:
+            self.draw_dirty()
         else:
-            self.ai_paddle.speed = 0
+            with self.profiler.scope('draw_scene'):
+                self.draw_scene()
+                self.profiler.draw_overlay(self.screen, self.text_cache, self.profiler_font, WHITE, (10, 90))
+            with self.profiler.scope('flip'):
+                pygame.display.flip()
+            self.full_redraw = self.profiler.overlay_visible
+            self.previous_rects = self.frame_rects()
     
-    def check_collisions(self):
-        # Check collision with paddles
-        if self.ball.rect.colliderect(self.player_paddle.rect) or self.ball.rect.colliderect(self.ai_paddle.rect):
-            self.ball.speed_x *= -1
+    def draw_dirty(self):
+        """Redraw only the old and new regions of objects that moved or changed"""
+        with self.profiler.scope('draw_dirty'):
+            current = self.frame_rects()
+            dirty = []
+            for name, (rect, content) in current.items():
+                previous, previous_content = self.previous_rects[name]
+                if rect != previous or content != previous_content:
+                    if rect.colliderect(previous):
+                        dirty.append(rect.union(previous))
+                    else:
+                        dirty.extend((previous, rect))
+            
+            # Re-render the full scene clipped to each region, so the result matches a full redraw
+            for rect in dirty:
+                self.screen.set_clip(rect)
+                self.draw_scene()
+            self.screen.set_clip(None)
         
-        # Check if ball goes out of bounds (scoring)
-        if self.ball.rect.left <= 0:
-            self.ai_score += 1
-            self.ball.reset()
-        elif self.ball.rect.right >= SCREEN_WIDTH:
-            self.player_score += 1
-            self.ball.reset()
+        with self.profiler.scope('flip'):
+            pygame.display.update(dirty)
+        self.previous_rects = current
     
-    def draw(self):
+    def draw_scene(self):
         self.screen.fill(BLACK)
         
         # Draw center line
         pygame.draw.aaline(self.screen, WHITE, (SCREEN_WIDTH // 2, 0), (SCREEN_WIDTH // 2, SCREEN_HEIGHT))
         
-        # Draw paddles and ball
-        self.player_paddle.draw(self.screen)
-        self.ai_paddle.draw(self.screen)
-        self.ball.draw(self.screen)
+        # Draw paddles and ball at their interpolated positions
+        for name in self.MOVING:
+            pygame.draw.rect(self.screen, WHITE, self.render_rects[name])
         
         # Draw scores
-        player_text = self.font.render(str(self.player_score), True, WHITE)
-        ai_text = self.font.render(str(self.ai_score), True, WHITE)
-        self.screen.blit(player_text, (SCREEN_WIDTH // 4, 20))
-        self.screen.blit(ai_text, (3 * SCREEN_WIDTH // 4, 20))
+        self.text_cache.blit(self.screen, self.font, str(self.player_score), WHITE, (SCREEN_WIDTH // 4, 20))
+        self.text_cache.blit(self.screen, self.font, str(self.ai_score), WHITE, (3 * SCREEN_WIDTH // 4, 20))
         
         # Draw controls info
-        controls_text = self.small_font.render("W/S: Move Paddle  |  ESC: Quit", True, WHITE)
-        self.screen.blit(controls_text, (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT - 40))
-        
-        pygame.display.flip()
+        self.text_cache.blit(self.screen, self.small_font, "W/S: Move Paddle  |  ESC: Quit", WHITE,
+                             (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT - 40))
     
     def run(self):
         running = True
         
         while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        running = False
-            
-            self.handle_input()
-            self.update_ai()
+            frame_time = self.clock.tick(self.max_fps) / 1000.0
+            self.profiler.begin_frame()
             
-            # Move objects
-            self.player_paddle.move()
-            self.ai_paddle.move()
-            self.ball.move()
+            with self.profiler.scope('events'):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            running = False
+                        elif event.key == pygame.K_F3:
+                            self.profiler.toggle_overlay()
+                            self.full_redraw = True
+                    elif event.type == pygame.VIDEOEXPOSE:
+                        self.full_redraw = True
             
-            # Check collisions
-            self.check_collisions()
+            timestep = self.timestep
+            for _ in range(timestep.advance(frame_time)):
+                self.previous_positions = self.positions()
+                with self.profiler.scope('input'):
+                    self.handle_input()
+                with self.profiler.scope('update'):
+                    self.step()
             
             # Draw everything
-            self.draw()
+            self.draw(timestep.alpha)
             
-            self.clock.tick(FPS)
+            self.profiler.end_frame()
+        
+        if self.profile_path and self.profiler.trace:
+            self.profiler.export(self.profile_path)
         
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
-    game = PongGame()
+    parser = argparse.ArgumentParser(description="Pong Game")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="redraw and push only the screen regions that changed")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="record per-frame timings and save them to a .json or .csv trace")
+    parser.add_argument("--max-fps", type=int, default=FPS,
+                        help=f"frame rate limit, 0 for none; the match always ticks at {FPS} Hz")
+    parser.add_argument("--difficulty", choices=("follow", "easy", "medium", "hard", "perfect"),
+                        default="follow",
+                        help="opponent AI: 'follow' chases the ball, the others predict where it will land")
+    args = parser.parse_args()
+    
+    right_ai = None
+    if args.difficulty != "follow":
+        from pong_ai import PredictiveAI
+        right_ai = PredictiveAI.level(args.difficulty)
+    game = PongGame(dirty_rects=args.dirty_rects, profile_path=args.profile, max_fps=args.max_fps,
+                    right_ai=right_ai)
     game.run()
\ No newline at end of file
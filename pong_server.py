@@ -0,0 +1,368 @@
+"""Authoritative multiplayer Pong server built on asyncio
+
+One process runs every match on a single fixed tick. Clients are paired into
+matches as they connect and send one signed byte whenever their paddle input
+changes (-1 up, 0 stop, 1 down). The server sends length-prefixed messages:
+a welcome with the client's side, one snapshot per tick carrying only the
+fields that changed since the previous snapshot, and a final game over.
+
+    python pong_server.py serve --port 8765
+    python pong_server.py bots 200 --port 8765     # 200 bot matches against a running server
+    python pong_server.py bench 200 --seconds 10   # server and bots in one process
+"""
+import argparse
+import asyncio
+import random
+import struct
+import sys
+
+from frame_profiler import FrameProfiler
+from pong_batch import POINTS_TO_WIN
+from pong_game import BALL_SIZE, FPS, PADDLE_HEIGHT, PADDLE_SPEED, PongSimulation
+
+WELCOME = 1
+SNAPSHOT = 2
+GAME_OVER = 3
+
+LENGTH = struct.Struct('<H')
+WELCOME_MESSAGE = struct.Struct('<BBI')  # type, side (0 left, 1 right), match id
+GAME_OVER_MESSAGE = struct.Struct('<BBB')  # type, left score, right score
+INPUT = struct.Struct('<b')
+
+# Snapshot fields in bit order; each snapshot holds only the fields whose bit is set
+SNAPSHOT_FIELDS = (
+    ('left_y', 'h'),
+    ('right_y', 'h'),
+    ('ball_x', 'h'),
+    ('ball_y', 'h'),
+    ('left_score', 'B'),
+    ('right_score', 'B'),
+)
+FULL_MASK = (1 << len(SNAPSHOT_FIELDS)) - 1
+# type, changed-field mask, tick, then the changed fields; one Struct per mask
+SNAPSHOT_STRUCTS = [
+    struct.Struct('<BBI' + ''.join(fmt for bit, (_, fmt) in enumerate(SNAPSHOT_FIELDS) if mask >> bit & 1))
+    for mask in range(FULL_MASK + 1)
+]
+
+MAX_WRITE_BUFFER = 64 * 1024  # Clients this far behind are dropped
+BACKLOG = 1024  # Room for hundreds of clients connecting at once
+REPORT_INTERVAL = 5.0
+
+
+def snapshot_values(sim):
+    return (sim.player_paddle.rect.y, sim.ai_paddle.rect.y, sim.ball.rect.x, sim.ball.rect.y,
+            sim.player_score, sim.ai_score)
+
+
+def frame(payload):
+    return LENGTH.pack(len(payload)) + payload
+
+
+def encode_snapshot(tick, values, previous=None):
+    """Framed snapshot holding the fields that differ from previous (all of them if None)"""
+    if previous is None:
+        mask, changed = FULL_MASK, values
+    else:
+        mask, changed = 0, []
+        for bit, (value, old) in enumerate(zip(values, previous)):
+            if value != old:
+                mask |= 1 << bit
+                changed.append(value)
+    return frame(SNAPSHOT_STRUCTS[mask].pack(SNAPSHOT, mask, tick, *changed))
+
+
+def apply_snapshot(payload, values):
+    """Update a list of last known field values from a snapshot payload; returns its tick"""
+    mask = payload[1]
+    fields = SNAPSHOT_STRUCTS[mask].unpack(payload)
+    changed = iter(fields[3:])
+    for bit in range(len(SNAPSHOT_FIELDS)):
+        if mask >> bit & 1:
+            values[bit] = next(changed)
+    return fields[2]
+
+
+async def read_message(reader):
+    (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+    return await reader.readexactly(length)
+
+
+class RemoteInput:
+    """Paddle controller that applies the last direction its client sent"""
+    def __init__(self):
+        self.direction = 0
+
+    def __call__(self, paddle, ball):
+        return self.direction * PADDLE_SPEED
+
+
+class Match:
+    """One server-side match between two connected clients"""
+    def __init__(self, match_id, writers, rng):
+        self.match_id = match_id
+        self.writers = writers
+        self.inputs = (RemoteInput(), RemoteInput())
+        self.sim = PongSimulation(*self.inputs, rng=rng)
+        self.sim.ball.reset(rng)
+        self.last_values = None
+        self.finished = False
+
+    def step(self, points_to_win):
+        """Advance one tick; returns the bytes to send to both players"""
+        sim = self.sim
+        sim.step()
+        values = snapshot_values(sim)
+        message = encode_snapshot(sim.ticks, values, self.last_values)
+        self.last_values = values
+        if max(sim.player_score, sim.ai_score) >= points_to_win:
+            message += frame(GAME_OVER_MESSAGE.pack(GAME_OVER, sim.player_score, sim.ai_score))
+            self.finished = True
+        return message
+
+
+class PongServer:
+    """Pairs clients into matches and steps every match on one shared tick"""
+    def __init__(self, tick_rate=FPS, points_to_win=POINTS_TO_WIN, seed=None):
+        self.tick_rate = tick_rate
+        self.points_to_win = points_to_win
+        self.rng = random.Random(seed)
+        self.waiting = None  # (writer, future) of a client waiting for an opponent
+        self.matches = []
+        self.next_match_id = 0
+        self.port = None
+        self.started = asyncio.Event()
+        self.running = False
+
+        # Statistics; the profiler's 'frame' samples are whole server ticks
+        self.profiler = FrameProfiler(enabled=True, max_trace_frames=0)
+        self.ticks = 0
+        self.late_ticks = 0
+        self.match_ticks = 0
+        self.matches_finished = 0
+        self.messages_sent = 0
+        self.bytes_sent = 0
+
+    async def wait_for_opponent(self, reader, writer):
+        """Hold a client in the waiting slot until a match starts
+
+        Returns (match, last input direction), or (None, 0) if the server
+        stopped or the client left first; a client that leaves gives up the
+        slot so the next arrival is not paired with a dead connection.
+        """
+        joined = asyncio.get_running_loop().create_future()
+        self.waiting = (writer, joined)
+        direction = 0
+        while True:
+            reading = asyncio.ensure_future(reader.read(256))
+            await asyncio.wait((joined, reading), return_when=asyncio.FIRST_COMPLETED)
+            if not reading.done():
+                # Unread input stays buffered for the match; wait for the read to
+                # unwind so the stream is free for the match loop
+                reading.cancel()
+                await asyncio.wait((reading,))
+            elif reading.exception() is not None or not reading.result():
+                if not joined.done():
+                    self.waiting = None
+                    joined.cancel()
+                    writer.close()
+                    return None, 0
+            else:
+                (direction,) = INPUT.unpack(reading.result()[-1:])
+            if joined.done():
+                return joined.result(), direction
+
+    async def handle_client(self, reader, writer):
+        if self.waiting is None:
+            match, direction = await self.wait_for_opponent(reader, writer)
+            if match is None:  # Server stopped or the client left before an opponent arrived
+                return
+            side = 0
+            if -1 <= direction <= 1:
+                match.inputs[side].direction = direction
+        else:
+            opponent, joined = self.waiting
+            self.waiting = None
+            match = Match(self.next_match_id, (opponent, writer), random.Random(self.rng.random()))
+            self.next_match_id += 1
+            self.matches.append(match)
+            for player, player_writer in enumerate(match.writers):
+                player_writer.write(frame(WELCOME_MESSAGE.pack(WELCOME, player, match.match_id)))
+            joined.set_result(match)
+            side = 1
+
+        remote = match.inputs[side]
+        try:
+            while True:
+                data = await reader.read(256)
+                if not data:
+                    break
+                # Only the latest input matters
+                (direction,) = INPUT.unpack(data[-1:])
+                if -1 <= direction <= 1:
+                    remote.direction = direction
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def tick(self):
+        """Step every match once and queue its snapshot for both players"""
+        profiler = self.profiler
+        profiler.begin_frame()
+        with profiler.scope('simulate'):
+            messages = [match.step(self.points_to_win) for match in self.matches]
+
+        with profiler.scope('send'):
+            for match, message in zip(self.matches, messages):
+                for writer in match.writers:
+                    if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                        match.finished = True  # Abandon matches with a lost or stalled player
+                        continue
+                    writer.write(message)
+                    self.messages_sent += 1
+                    self.bytes_sent += len(message)
+                if match.finished:
+                    for writer in match.writers:
+                        writer.close()
+
+        self.ticks += 1
+        self.match_ticks += len(self.matches)
+        finished = sum(1 for match in self.matches if match.finished)
+        if finished:
+            self.matches_finished += finished
+            self.matches = [match for match in self.matches if not match.finished]
+        profiler.end_frame()
+
+    async def serve(self, host='127.0.0.1', port=8765, report_interval=None):
+        server = await asyncio.start_server(self.handle_client, host, port, backlog=BACKLOG)
+        self.port = server.sockets[0].getsockname()[1]
+        self.running = True
+        self.started.set()
+
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.tick_rate
+        next_tick = loop.time()
+        next_report = next_tick + report_interval if report_interval else None
+        async with server:
+            while self.running:
+                self.tick()
+                next_tick += interval
+                now = loop.time()
+                if now > next_tick:
+                    # Fell behind; count it and resume the schedule from now
+                    self.late_ticks += 1
+                    next_tick = now
+                if next_report is not None and now >= next_report:
+                    print(self.report())
+                    next_report += report_interval
+                await asyncio.sleep(next_tick - now)
+
+            # Disconnect everyone so the server can close
+            for match in self.matches:
+                for writer in match.writers:
+                    writer.close()
+            if self.waiting is not None:
+                writer, joined = self.waiting
+                self.waiting = None
+                writer.close()
+                joined.set_result(None)
+
+    def report(self):
+        """One-paragraph summary of load, tick latency and bandwidth"""
+        percentiles = self.profiler.percentiles()
+        if percentiles is None:
+            return "No ticks yet"
+        p50, p95, p99 = percentiles
+        average_matches = self.match_ticks / max(self.ticks, 1)
+        tick_budget = 1000.0 / self.tick_rate
+        # Matches one core could tick at this rate if ticks took p50 each
+        capacity = average_matches * tick_budget / p50 if p50 > 0 else float('inf')
+        return (f"{self.ticks} ticks, {len(self.matches)} live matches ({average_matches:.0f} average), "
+                f"{self.matches_finished} finished, {self.late_ticks} late ticks\n"
+                f"tick ms p50 {p50:.3f}  p95 {p95:.3f}  p99 {p99:.3f}  "
+                f"(budget {tick_budget:.1f}; ~{capacity:,.0f} matches per core)\n"
+                f"{self.messages_sent:,} messages, {self.bytes_sent / max(self.messages_sent, 1):.1f} bytes each")
+
+
+async def run_bot(host, port, dead_zone=10):
+    """Play one match as a ball-following client; returns (snapshots, bytes received)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    snapshots = 0
+    received = 0
+    try:
+        _, side, _ = WELCOME_MESSAGE.unpack(await read_message(reader))
+        paddle_field = 1 if side else 0
+        values = [0] * len(SNAPSHOT_FIELDS)
+        direction = 0
+        while True:
+            payload = await read_message(reader)
+            received += LENGTH.size + len(payload)
+            if payload[0] == GAME_OVER:
+                break
+            apply_snapshot(payload, values)
+            snapshots += 1
+
+            offset = (values[3] + BALL_SIZE / 2) - (values[paddle_field] + PADDLE_HEIGHT / 2)
+            wanted = 1 if offset > dead_zone else (-1 if offset < -dead_zone else 0)
+            if wanted != direction:
+                direction = wanted
+                writer.write(INPUT.pack(direction))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+    return snapshots, received
+
+
+async def run_bots(host, port, matches, seed=0):
+    rng = random.Random(seed)
+    results = await asyncio.gather(
+        *(run_bot(host, port, rng.randint(0, 30)) for _ in range(matches * 2)),
+        return_exceptions=True
+    )
+    played = [result for result in results if not isinstance(result, BaseException)]
+    snapshots = sum(s for s, _ in played)
+    received = sum(r for _, r in played)
+    print(f"{len(played)} bots finished, {snapshots:,} snapshots, "
+          f"{received / max(snapshots, 1):.1f} bytes per snapshot")
+
+
+async def bench(matches, seconds, seed=0):
+    """Run a server and bot clients over localhost in this process, then report"""
+    server = PongServer(seed=seed)
+    serving = asyncio.create_task(server.serve())
+    await server.started.wait()
+    bots = asyncio.create_task(run_bots('127.0.0.1', server.port, matches, seed))
+    await asyncio.sleep(seconds)
+    server.running = False
+    await serving
+    await bots
+    print(server.report())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multiplayer Pong server and bot clients")
+    parser.add_argument('mode', choices=('serve', 'bots', 'bench'))
+    parser.add_argument('matches', type=int, nargs='?', default=100,
+                        help="bot matches to play (bots and bench modes)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seconds', type=float, default=10.0, help="bench duration")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.mode == 'serve':
+        server = PongServer(seed=args.seed)
+        try:
+            asyncio.run(server.serve(args.host, args.port, report_interval=REPORT_INTERVAL))
+        except KeyboardInterrupt:
+            print(server.report())
+    elif args.mode == 'bots':
+        asyncio.run(run_bots(args.host, args.port, args.matches, args.seed))
+    else:
+        asyncio.run(bench(args.matches, args.seconds, args.seed))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
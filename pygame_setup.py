@@ -0,0 +1,28 @@
+"""Explicit pygame start-up shared by both games
+
+Importing the games has no side effects. Each game calls init_display() when
+it is created, which starts only the display and font subsystems rather than
+everything pygame.init() brings up (audio, joystick and the rest). Fonts are
+loaded once per size and shared by every game in the process.
+"""
+import pygame
+
+_fonts = {}
+
+
+def init_display():
+    """Start the display and font subsystems; safe to call repeatedly"""
+    if not pygame.font.get_init():
+        _fonts.clear()  # Fonts loaded before a pygame.quit() can no longer render
+        pygame.font.init()
+    if not pygame.display.get_init():
+        pygame.display.init()
+
+
+def get_font(size):
+    """The default font at a size, loaded on first use"""
+    init_display()
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
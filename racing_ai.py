@@ -0,0 +1,103 @@
+"""Vectorized AI drivers for racing opponents
+
+LookaheadDriver chooses throttle, brake and boost for every car in a CarFleet
+in one batch. It samples the track a few ticks ahead of each car (at top
+speed) and reacts to upcoming turns, climbs and drops, so dozens of
+opponents cost a handful of array operations per tick rather than a Python
+decision loop per car.
+"""
+import sys
+import time
+
+import numpy as np
+
+from racing_fleet import CarFleet
+from racing_game import Track
+from racing_sim import CONTROL_NAMES, FIXED_DT
+
+LOOKAHEAD_TICKS = (2, 4, 8, 16)
+
+
+class LookaheadDriver:
+    """Throttle/brake/boost policy for a whole CarFleet
+
+    skill (0-1, a scalar or one value per car) sets how fast each car takes
+    turns and how much boost it keeps in reserve. Calling the driver with the
+    fleet returns a controls dict of (N,) bool arrays for CarFleet.update; the
+    arrays are reused between calls.
+    """
+    def __init__(self, count, skill=0.8, lookahead_ticks=LOOKAHEAD_TICKS, turn_slowdown=0.5,
+                 drop_height=4.0):
+        self.skill = np.broadcast_to(np.asarray(skill, dtype=float), (count,)).copy()
+        self.lookahead = np.asarray(lookahead_ticks, dtype=float)
+        self.turn_slowdown = turn_slowdown
+        self.drop_height = drop_height
+        self.controls = {name: np.zeros(count, dtype=bool) for name in CONTROL_NAMES}
+
+    def lookahead_features(self, fleet):
+        """Per car: sharpest heading change, climb and deepest drop over the lookahead"""
+        count = len(fleet)
+        step = fleet.physics.max_speed * 0.001 * fleet.track.progress_scale  # Progress per tick at top speed
+        ahead = fleet.progress[:, None] + self.lookahead * step
+        positions, angles, _ = fleet.track.get_positions_on_track(ahead.ravel())
+        angles = angles.reshape(count, -1)
+        heights = positions[:, 1].reshape(count, -1)
+
+        # Heading changes are wrapped so the short way round is measured
+        turn = np.abs((angles - fleet.angle[:, None] + np.pi) % (2 * np.pi) - np.pi).max(axis=1)
+        climb = heights[:, -1] - fleet.position[:, 1]
+        drop = (fleet.position[:, 1][:, None] - heights).max(axis=1)
+        return turn, climb, drop
+
+    def __call__(self, fleet):
+        physics = fleet.physics
+        max_speed = physics.max_speed
+        turn, climb, drop = self.lookahead_features(fleet)
+
+        # Slow for corners in proportion to how sharp they are; better drivers slow less
+        sharpness = np.minimum(turn / (np.pi / 2), 1.0)
+        target = max_speed * (1 - self.turn_slowdown * (1.5 - self.skill) * sharpness)
+        velocity = fleet.velocity
+
+        controls = self.controls
+        np.less(velocity, target, out=controls['throttle'])
+        np.greater(velocity, target + physics.brake_force * 2, out=controls['brake'])
+
+        # Boost on straight, level or rising track with no drop ahead, keeping a reserve
+        reserve = (1 - self.skill) * fleet.max_boost / 2
+        np.logical_and.reduce((
+            fleet.on_ground,
+            sharpness < 0.15,
+            climb > -1.0,
+            drop < self.drop_height,
+            fleet.boost_amount > reserve,
+            velocity < max_speed,
+        ), out=controls['boost'])
+        return controls
+
+
+def make_opponents(track, count, physics=None, spacing=0.01):
+    """CarFleet lined up ahead of the start with a spread of skills, and its driver"""
+    fleet = CarFleet(track, count, physics)
+    fleet.progress[:] = (np.arange(count) + 1) * spacing * track.progress_scale
+    fleet.current_lap[:] = 1  # Same starting lap as the player
+    driver = LookaheadDriver(count, skill=np.linspace(0.5, 1.0, count) if count > 1 else 0.8)
+    return fleet, driver
+
+
+def main(count=48, ticks=3600):
+    fleet, driver = make_opponents(Track(), count)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        fleet.update(FIXED_DT, driver(fleet))
+    elapsed = time.perf_counter() - start
+    print(f"{count} AI cars x {ticks} ticks: {elapsed / ticks * 1000:.3f} ms/tick (driver and physics)")
+
+    order = np.lexsort((fleet.progress, fleet.current_lap))[::-1]
+    for place, i in enumerate(order[:5], 1):
+        print(f"  {place}. car {i:2d} skill {driver.skill[i]:.2f}  lap {fleet.current_lap[i]}  "
+              f"progress {fleet.progress[i]:.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 48)
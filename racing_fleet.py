@@ -0,0 +1,150 @@
+import sys
+import time
+
+import numpy as np
+
+from racing_game import CAR_BOX_ARRAY, Car, PhysicsParams, Track
+from racing_sim import CONTROL_NAMES, FIXED_DT
+from vecmath import rotate_y_translate_many
+
+
+class CarFleet:
+    """Many cars stored as parallel NumPy arrays and advanced in one call
+
+    Follows the same throttle/brake/boost/friction/gravity and checkpoint
+    rules as Car.update, so car i matches a scalar Car fed the same controls.
+    """
+    def __init__(self, track, count, physics=None):
+        self.track = track
+        self.count = count
+        self.physics = physics if physics is not None else PhysicsParams()
+        self.progress = np.zeros(count)
+        self.position = np.zeros((count, 3))
+        self.velocity = np.zeros(count)
+        self.vertical_velocity = np.zeros(count)
+        self.angle = np.zeros(count)
+        self.on_ground = np.ones(count, dtype=bool)
+        self.boost_amount = np.full(count, 100.0)
+        self.boost_recharge_rate = 0.1
+        self.max_boost = 100
+        self.lap_time = np.zeros(count)
+        self.current_lap = np.zeros(count, dtype=int)
+        self.last_checkpoint = np.full(count, -1)
+        self.segment_index = np.zeros(count, dtype=int)
+
+    def __len__(self):
+        return self.count
+
+    def update(self, dt, controls):
+        """Advance every car one step
+
+        controls maps each name in CONTROL_NAMES to a bool or an (N,) bool array.
+        """
+        physics = self.physics
+        pressed = {name: np.broadcast_to(np.asarray(controls[name], dtype=bool), (self.count,))
+                   for name in CONTROL_NAMES}
+
+        # Handle acceleration and braking
+        velocity = np.where(pressed['throttle'], self.velocity + physics.acceleration, self.velocity)
+        velocity = np.where(pressed['brake'], velocity - physics.brake_force, velocity)
+
+        # Handle boost
+        boosting = pressed['boost'] & (self.boost_amount > 0) & self.on_ground
+        velocity = np.where(boosting, velocity + physics.boost_power, velocity)
+        self.boost_amount = np.where(
+            boosting,
+            self.boost_amount - 1,
+            np.minimum(self.max_boost, self.boost_amount + self.boost_recharge_rate)
+        )
+
+        # Apply friction and limits
+        velocity = velocity * np.where(self.on_ground, physics.friction, physics.air_resistance)
+        max_speed = physics.max_speed
+        velocity = np.maximum(-max_speed / 2, np.minimum(max_speed, velocity))
+        self.velocity = velocity
+
+        # Handle steering
+        speed = np.abs(velocity)
+        steer = speed > 0.5
+        progress_scale = self.track.progress_scale
+        turn = physics.turn_speed * speed / max_speed * progress_scale
+        previous_progress = self.progress
+        progress = np.where(pressed['left'] & steer, self.progress - turn, self.progress)
+        progress = np.where(pressed['right'] & steer, progress + turn, progress)
+
+        # Update position on track
+        progress = (progress + velocity * 0.001 * progress_scale) % 1.0
+        self.progress = progress
+
+        # Get track position and angle
+        track_pos, track_angle, segment_index = self.track.get_positions_on_track(progress)
+        self.angle = track_angle
+        self.segment_index = segment_index
+
+        # Check if on ground (simple collision detection)
+        airborne = self.position[:, 1] > track_pos[:, 1] + 0.5
+        self.on_ground = ~airborne
+        vertical_velocity = np.where(airborne, self.vertical_velocity - physics.gravity * dt, 0.0)
+        position_y = np.where(airborne, self.position[:, 1], track_pos[:, 1])
+        self.vertical_velocity = vertical_velocity
+
+        # Update vertical and horizontal position
+        self.position[:, 1] = position_y + vertical_velocity
+        self.position[:, 0] = track_pos[:, 0]
+        self.position[:, 2] = track_pos[:, 2]
+
+        # Check checkpoint crossings along the distance moved this tick
+        checkpoint = self.track.checkpoints_crossed(previous_progress, progress)
+        reached = (checkpoint != -1) & (checkpoint != self.last_checkpoint)
+        self.last_checkpoint = np.where(reached, checkpoint, self.last_checkpoint)
+        lapped = reached & (checkpoint == 0) & (self.current_lap > 0)
+        self.current_lap = self.current_lap + lapped
+
+        # Update lap time
+        self.lap_time = self.lap_time + dt
+
+    def get_corners(self, out=None):
+        """Body corners of every car as a (count, 8, 3) array, in Car.get_corners order"""
+        return rotate_y_translate_many(CAR_BOX_ARRAY, self.angle, self.position, out)
+
+
+def max_deviation(ticks=2000, count=64, seed=0):
+    """Run the fleet and scalar Cars on the same random controls; return the worst error"""
+    rng = np.random.default_rng(seed)
+    track = Track()
+    fleet = CarFleet(track, count)
+    cars = [Car(track) for _ in range(count)]
+    worst = 0.0
+
+    for _ in range(ticks):
+        pressed = {name: rng.random(count) < 0.5 for name in CONTROL_NAMES}
+        fleet.update(FIXED_DT, pressed)
+        for i, car in enumerate(cars):
+            car.update(FIXED_DT, {name: bool(pressed[name][i]) for name in CONTROL_NAMES})
+            if car.current_lap != fleet.current_lap[i] or car.on_ground != fleet.on_ground[i]:
+                return float('inf')
+            worst = max(
+                worst,
+                abs(car.progress - fleet.progress[i]),
+                abs(car.velocity - fleet.velocity[i]),
+                abs(car.position.y - fleet.position[i, 1]),
+                abs(car.boost_amount - fleet.boost_amount[i])
+            )
+    return worst
+
+
+def main(count=10000, ticks=600):
+    print(f"Max deviation from scalar Car: {max_deviation():.3g}")
+
+    fleet = CarFleet(Track(), count)
+    controls = {name: name == 'throttle' for name in CONTROL_NAMES}
+    start = time.perf_counter()
+    for _ in range(ticks):
+        fleet.update(FIXED_DT, controls)
+    elapsed = time.perf_counter() - start
+    print(f"{count} cars x {ticks} ticks: {elapsed / ticks * 1000:.2f} ms/tick "
+          f"({count * ticks / elapsed:,.0f} car-steps/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -1,10 +1,19 @@
 import pygame
+import argparse
 import sys
 import math
 import time
+from bisect import bisect_left, bisect_right
 
-# Initialize Pygame
-pygame.init()
+import numpy as np
+
+from frame_profiler import FrameProfiler
+from fixed_step import FixedTimestep
+from pygame_setup import get_font, init_display
+from render_queue import RenderQueue
+from telemetry import TelemetryBuffer, TelemetryFlusher
+from text_cache import TextCache
+from vecmath import Vector3, rotate_y_translate, rotate_y_translate_many
 
 # Constants
 SCREEN_WIDTH = 800
@@ -29,21 +38,35 @@ BRAKE_FORCE = 0.5
 BOOST_POWER = 1.5
 TURN_SPEED = 0.05
 
-class Vector3:
-    """Simple 3D vector class"""
-    def __init__(self, x=0, y=0, z=0):
-        self.x = x
-        self.y = y
-        self.z = z
+class PhysicsParams:
+    """Physics constants for one car, defaulting to the module-level values
+    
+    Passing a PhysicsParams to Car lets simulations run with different tuning
+    side by side without mutating the module globals.
+    """
+    NAMES = ('gravity', 'friction', 'air_resistance', 'max_speed',
+             'acceleration', 'brake_force', 'boost_power', 'turn_speed')
     
-    def copy(self):
-        return Vector3(self.x, self.y, self.z)
+    def __init__(self, **overrides):
+        self.gravity = GRAVITY
+        self.friction = FRICTION
+        self.air_resistance = AIR_RESISTANCE
+        self.max_speed = MAX_SPEED
+        self.acceleration = ACCELERATION
+        self.brake_force = BRAKE_FORCE
+        self.boost_power = BOOST_POWER
+        self.turn_speed = TURN_SPEED
+        for name, value in overrides.items():
+            if name not in self.NAMES:
+                raise TypeError(f"Unknown physics parameter: {name}")
+            setattr(self, name, value)
     
-    def add(self, other):
-        return Vector3(self.x + other.x, self.y + other.y, self.z + other.z)
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.NAMES}
     
-    def scale(self, scalar):
-        return Vector3(self.x * scalar, self.y * scalar, self.z * scalar)
+    def __repr__(self):
+        values = ", ".join(f"{name}={value!r}" for name, value in self.as_dict().items())
+        return f"PhysicsParams({values})"
 
 class Camera:
     """3D camera for perspective projection"""
@@ -52,6 +75,8 @@ class Camera:
         self.rotation = 0
         self.fov = 400
         self.horizon = SCREEN_HEIGHT // 2
+        self.draw_distance = 400  # Segments further away are culled
+        self.lod_distance = 150  # Segments further away are drawn as outlines only
     
     def project(self, point):
         """Project 3D point to 2D screen coordinates"""
@@ -74,6 +99,65 @@ class Camera:
             screen_y = self.horizon - dy * scale
             return (int(screen_x), int(screen_y), rotated_z)
         return None
+    
+    def project_points(self, points):
+        """Project an (N, 3) array of 3D points to 2D screen coordinates in one pass
+        
+        Returns (screen_x, screen_y, depth, visible). Screen coordinates are only
+        meaningful where visible is True, matching the points project() accepts.
+        """
+        points = np.asarray(points, dtype=float)
+        cos_angle = math.cos(self.rotation)
+        sin_angle = math.sin(self.rotation)
+        
+        dx = points[:, 0] - self.position.x
+        dy = points[:, 1] - self.position.y
+        dz = points[:, 2] - self.position.z
+        
+        rotated_x = dx * cos_angle - dz * sin_angle
+        rotated_z = dx * sin_angle + dz * cos_angle
+        
+        # Perspective projection (points behind the near plane get a dummy scale)
+        visible = rotated_z > 0.1
+        scale = self.fov / np.where(visible, rotated_z, 1.0)
+        screen_x = (SCREEN_WIDTH // 2 + rotated_x * scale).astype(int)
+        screen_y = (self.horizon - dy * scale).astype(int)
+        return screen_x, screen_y, rotated_z, visible
+    
+    def view_bounds(self):
+        """Ground-plane bounding box (min_x, min_z, max_x, max_z) of the view frustum"""
+        # Forward and right vectors matching the rotation used by project()
+        forward_x, forward_z = math.sin(self.rotation), math.cos(self.rotation)
+        right_x, right_z = forward_z, -forward_x
+        
+        far = self.draw_distance
+        spread = far * (SCREEN_WIDTH / 2) / self.fov
+        center_x = self.position.x + forward_x * far
+        center_z = self.position.z + forward_z * far
+        xs = (self.position.x, center_x + right_x * spread, center_x - right_x * spread)
+        zs = (self.position.z, center_z + right_z * spread, center_z - right_z * spread)
+        return min(xs), min(zs), max(xs), max(zs)
+    
+    def cull_segments(self, corners):
+        """Return a mask of the (M, 4, 3) corner sets that may be on screen
+        
+        A segment is rejected when all of its corners lie behind the near plane,
+        beyond the draw distance, or outside the same side of the view.
+        """
+        cos_angle = math.cos(self.rotation)
+        sin_angle = math.sin(self.rotation)
+        dx = corners[:, :, 0] - self.position.x
+        dz = corners[:, :, 2] - self.position.z
+        rotated_x = dx * cos_angle - dz * sin_angle
+        rotated_z = dx * sin_angle + dz * cos_angle
+        
+        half_width = rotated_z * ((SCREEN_WIDTH / 2) / self.fov)
+        return ~(
+            (rotated_z <= 0.1).all(axis=1)
+            | (rotated_z >= self.draw_distance).all(axis=1)
+            | (rotated_x > half_width).all(axis=1)
+            | (rotated_x < -half_width).all(axis=1)
+        )
 
 class TrackSegment:
     """Represents a segment of the racing track"""
@@ -103,12 +187,344 @@ class TrackSegment:
             Vector3(self.end.x + offset_x, self.end.y, self.end.z + offset_z)
         ]
 
+class SegmentGrid:
+    """Uniform grid over segment bounding boxes on the ground plane
+    
+    Each segment is entered in every cell its bounding box overlaps. The
+    entries are sorted by cell, with cells numbered column by column, so the
+    occupied cells of one grid column inside a query box form a single
+    block found by binary search.
+    """
+    def __init__(self, corners, cell_size=32.0):
+        self.cell_size = cell_size
+        # Ground-plane bounding box of each segment's four corners
+        ground = corners[:, :, ::2]
+        low = np.minimum(np.minimum(ground[:, 0], ground[:, 1]), np.minimum(ground[:, 2], ground[:, 3]))
+        high = np.maximum(np.maximum(ground[:, 0], ground[:, 1]), np.maximum(ground[:, 2], ground[:, 3]))
+        low = np.floor(low / cell_size).astype(np.int64)
+        high = np.floor(high / cell_size).astype(np.int64)
+        
+        # Range of occupied cells, so queries never walk the empty cells around the track
+        self.low_cell = low.min(axis=0).tolist() if len(low) else [0, 0]
+        self.high_cell = high.max(axis=0).tolist() if len(high) else [-1, -1]
+        self.rows = self.high_cell[1] - self.low_cell[1] + 1  # Cells per grid column
+        
+        # One entry per (segment, overlapped cell), built without a per-cell loop
+        spans = high - low + 1
+        counts = spans[:, 0] * spans[:, 1]
+        segments = np.repeat(np.arange(len(low)), counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        span_z = np.repeat(spans[:, 1], counts)
+        cell_x = np.repeat(low[:, 0], counts) + within // span_z
+        cell_z = np.repeat(low[:, 1], counts) + within % span_z
+        codes = (cell_x - self.low_cell[0]) * self.rows + (cell_z - self.low_cell[1])
+        
+        # Segment indices grouped by cell; cell k holds indices[offsets[k]:offsets[k + 1]]
+        order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+        self.indices = segments[order]
+        firsts = np.flatnonzero(np.concatenate(([len(codes) > 0], codes[1:] != codes[:-1])))
+        self.codes = codes[firsts]
+        self.offsets = np.append(firsts, len(codes))
+    
+    def query_box(self, min_x, min_z, max_x, max_z):
+        """Return sorted indices of segments whose cells overlap the given box"""
+        size = self.cell_size
+        low_x, low_z = self.low_cell
+        high_x, high_z = self.high_cell
+        first_x = max(int(math.floor(min_x / size)), low_x)
+        last_x = min(int(math.floor(max_x / size)), high_x)
+        first_z = max(int(math.floor(min_z / size)), low_z)
+        last_z = min(int(math.floor(max_z / size)), high_z)
+        if first_x > last_x or first_z > last_z:
+            return self.indices[:0]
+        
+        # The occupied cells of each grid column in the box, as a block of entries
+        columns = (np.arange(first_x, last_x + 1) - low_x) * self.rows
+        begin = self.offsets[np.searchsorted(self.codes, columns + (first_z - low_z), side='left')]
+        end = self.offsets[np.searchsorted(self.codes, columns + (last_z - low_z), side='right')]
+        counts = end - begin
+        total = int(counts.sum())
+        if not total:
+            return self.indices[:0]
+        entries = np.repeat(begin - (np.cumsum(counts) - counts), counts) + np.arange(total)
+        
+        # Sort and drop repeats by hand; np.unique also imports numpy.ma on first use
+        found = np.sort(self.indices[entries])
+        return found[np.concatenate(([True], found[1:] != found[:-1]))]
+
+def interpolate_segments(starts, ends, offsets):
+    """Points `offsets` along segments from starts to ends (N, 3), and the segments' headings"""
+    deltas = np.subtract(ends, starts, dtype=float)
+    lengths = np.sqrt((deltas * deltas).sum(axis=1))
+    local_progress = np.where(lengths > 0, offsets / np.where(lengths > 0, lengths, 1.0), 0.0)
+    return starts + deltas * local_progress[:, None], np.arctan2(deltas[:, 0], deltas[:, 2])
+
+def as_float_array(values):
+    """Array view of values, converted to float64 only if not already floating point"""
+    array = np.asarray(values)
+    return array if array.dtype.kind == 'f' else array.astype(float)
+
+class TrackGeometry:
+    """Contiguous arrays holding the compiled geometry of a track
+    
+    points stores the four corners of every segment followed by the two pillar
+    base points under each segment start, so the renderer can project the whole
+    track straight from this buffer. corners and pillar_bases are views into it.
+    
+    Only the centre line, widths and checkpoints are needed up front. The
+    derived arrays are built on first use, or taken as given: a track file
+    passes its own points and cumulative_lengths, so they stay memory-mapped.
+    """
+    def __init__(self, starts, ends, widths, checkpoint_mask, points=None, cumulative_lengths=None):
+        # Float inputs are kept as given (e.g. float32 views of a memory-mapped file)
+        self.starts = as_float_array(starts).reshape(-1, 3)
+        self.ends = as_float_array(ends).reshape(-1, 3)
+        self.widths = as_float_array(widths)
+        self._shape = None
+        self._points = points
+        self._cumulative_lengths = cumulative_lengths
+        self._elevated = None
+        self.set_checkpoint_mask(checkpoint_mask)
+        self._grid = None
+    
+    def segment_shape(self):
+        """(deltas, lengths, angles, ground_lengths, directions), built on first use"""
+        if self._shape is None:
+            delta = np.subtract(self.ends, self.starts, dtype=float)
+            lengths = np.sqrt((delta * delta).sum(axis=1))
+            # Track direction on the ground plane
+            ground_lengths = np.hypot(delta[:, 0], delta[:, 2])
+            safe_ground = np.where(ground_lengths > 0, ground_lengths, 1.0)
+            self._shape = (
+                delta,
+                lengths,
+                np.arctan2(delta[:, 0], delta[:, 2]),
+                ground_lengths,
+                np.stack((delta[:, 0], delta[:, 2]), axis=1) / safe_ground[:, None],
+            )
+        return self._shape
+    
+    @property
+    def deltas(self):
+        return self.segment_shape()[0]
+    
+    @property
+    def lengths(self):
+        return self.segment_shape()[1]
+    
+    @property
+    def angles(self):
+        return self.segment_shape()[2]
+    
+    @property
+    def directions(self):
+        return self.segment_shape()[4]
+    
+    @property
+    def cumulative_lengths(self):
+        """Arc-length table: cumulative_lengths[i] is the distance to the start of segment i"""
+        if self._cumulative_lengths is None:
+            self._cumulative_lengths = np.concatenate(([0.0], np.cumsum(self.lengths)))
+        return self._cumulative_lengths
+    
+    @property
+    def total_length(self):
+        return float(self.cumulative_lengths[-1])
+    
+    @property
+    def points(self):
+        if self._points is None:
+            self._points = self.compile_points()
+        return self._points
+    
+    @property
+    def corners(self):
+        return self.points[:len(self) * 4].reshape(-1, 4, 3)
+    
+    @property
+    def pillar_bases(self):
+        return self.points[len(self) * 4:].reshape(-1, 2, 3)
+    
+    def compile_points(self):
+        """Corner and pillar base buffer for rendering"""
+        count = len(self)
+        length = self.segment_shape()[3]
+        
+        # Perpendicular offset for track width (degenerate segments offset along x)
+        offset_x = np.where(length > 0, -self.directions[:, 1] * self.widths, self.widths)
+        offset_z = np.where(length > 0, self.directions[:, 0] * self.widths, 0.0)
+        
+        points = np.empty((count * 6, 3))
+        corners = points[:count * 4].reshape(count, 4, 3)
+        corners[:, 0] = self.starts
+        corners[:, 1] = self.starts
+        corners[:, 2] = self.ends
+        corners[:, 3] = self.ends
+        for corner, sign in ((0, 1), (1, -1), (2, -1), (3, 1)):
+            corners[:, corner, 0] += sign * offset_x
+            corners[:, corner, 2] += sign * offset_z
+        
+        pillar_bases = points[count * 4:].reshape(count, 2, 3)
+        pillar_bases[:] = corners[:, :2]
+        pillar_bases[:, :, 1] = 0
+        return points
+    
+    @property
+    def elevated(self):
+        if self._elevated is None:
+            self._elevated = self.starts[:, 1] > 2
+        return self._elevated
+    
+    def set_checkpoint_mask(self, checkpoint_mask):
+        """Replace the checkpoint flags without recompiling the geometry"""
+        self.checkpoint_mask = np.asarray(checkpoint_mask, dtype=bool)
+        self._checkpoint_starts = None
+        self._checkpoint_start_lists = None
+    
+    @property
+    def checkpoint_starts(self):
+        """(fractions, segments): where along the track (0-1) each checkpoint segment starts, ascending"""
+        if self._checkpoint_starts is None:
+            segments = np.flatnonzero(self.checkpoint_mask)
+            fractions = self.cumulative_lengths[segments] / self.total_length if self.total_length > 0 \
+                else np.zeros(len(segments))
+            self._checkpoint_starts = (fractions, segments)
+        return self._checkpoint_starts
+    
+    def checkpoint_start_lists(self):
+        """checkpoint_starts as lists, for scalar cars"""
+        if self._checkpoint_start_lists is None:
+            fractions, segments = self.checkpoint_starts
+            self._checkpoint_start_lists = (fractions.tolist(), segments.tolist())
+        return self._checkpoint_start_lists
+    
+    def checkpoint_crossed(self, previous, fraction):
+        """Checkpoint segment whose start was passed moving from previous to fraction, or -1
+        
+        Positions are fractions (0-1) of the track's length, and the move is
+        taken the short way round. Checkpoints are crossed by distance rather
+        than by the segment a car lands in, so fast cars cannot step over
+        short checkpoint segments. If several were passed, the one nearest
+        fraction wins.
+        """
+        starts, segments = self.checkpoint_start_lists()
+        if not starts:
+            return -1
+        # Both sides are measured from previous, so a checkpoint exactly there counts
+        ahead = (fraction - previous) % 1.0
+        if ahead < 0.5:
+            i = bisect_right(starts, fraction) - 1  # -1 wraps round to the last checkpoint
+            crossed = (starts[i] - previous) % 1.0 <= ahead
+        else:
+            i = bisect_left(starts, fraction) % len(starts)
+            crossed = (previous - starts[i]) % 1.0 <= (previous - fraction) % 1.0
+        return segments[i] if crossed else -1
+    
+    def checkpoints_crossed(self, previous, fractions):
+        """Batched checkpoint_crossed for arrays of positions"""
+        starts, segments = self.checkpoint_starts
+        if not len(starts):
+            return np.full(len(fractions), -1)
+        ahead = (fractions - previous) % 1.0
+        forward = ahead < 0.5
+        index = np.where(forward, np.searchsorted(starts, fractions, side='right') - 1,
+                         np.searchsorted(starts, fractions, side='left') % len(starts))
+        crossed = np.where(forward, (starts[index] - previous) % 1.0 <= ahead,
+                           (previous - starts[index]) % 1.0 <= (previous - fractions) % 1.0)
+        return np.where(crossed, segments[index], -1)
+    
+    @classmethod
+    def from_segments(cls, segments, checkpoints):
+        """Compile a list of TrackSegments and checkpoint indices"""
+        starts = [(s.start.x, s.start.y, s.start.z) for s in segments]
+        ends = [(s.end.x, s.end.y, s.end.z) for s in segments]
+        widths = [s.width for s in segments]
+        checkpoint_mask = np.zeros(len(segments), dtype=bool)
+        checkpoint_mask[list(checkpoints)] = True
+        return cls(starts, ends, widths, checkpoint_mask)
+    
+    def position_at(self, distance):
+        """Position, heading and segment index at a distance along the geometry"""
+        cumulative = self.cumulative_lengths
+        
+        # Binary search the arc-length table for the segment holding this distance,
+        # then read just that segment, so a memory-mapped track is never copied
+        segment_index = min(int(cumulative.searchsorted(distance, side='right')), len(self)) - 1
+        start_x, start_y, start_z = self.starts[segment_index].tolist()
+        end_x, end_y, end_z = self.ends[segment_index].tolist()
+        dx = end_x - start_x
+        dy = end_y - start_y
+        dz = end_z - start_z
+        length = math.sqrt(dx * dx + dy * dy + dz * dz)
+        
+        local_progress = (distance - cumulative.item(segment_index)) / length if length > 0 else 0.0
+        
+        # Interpolate position
+        pos = Vector3(
+            start_x + dx * local_progress,
+            start_y + dy * local_progress,
+            start_z + dz * local_progress
+        )
+        
+        # np.arctan2 rather than math.atan2, to match positions_at to the last bit
+        return pos, float(np.arctan2(dx, dz)), segment_index
+    
+    def positions_at(self, distances):
+        """Batched position_at; returns (positions (N, 3), angles (N,), segment_indices (N,))"""
+        segment_indices = np.minimum(
+            np.searchsorted(self.cumulative_lengths, distances, side='right'), len(self)
+        ) - 1
+        # Only the looked-up segments are measured, so a large memory-mapped
+        # track never needs its full per-segment arrays for this
+        positions, angles = interpolate_segments(
+            self.starts[segment_indices], self.ends[segment_indices],
+            distances - self.cumulative_lengths[segment_indices]
+        )
+        return positions, angles, segment_indices
+    
+    @property
+    def grid(self):
+        """Spatial index over the segments, built on first use"""
+        if self._grid is None:
+            self._grid = SegmentGrid(self.corners)
+        return self._grid
+    
+    def __len__(self):
+        return len(self.starts)
+
 class Track:
     """Elevated racing track with jumps, ramps, and banked turns"""
-    def __init__(self):
-        self.segments = []
+    checkpoint_count = 5
+    progress_scale = 1.0  # Multiplies progress changes so long tracks keep the same world speed
+    
+    def __init__(self, geometry=None):
+        self._segments = []
         self.checkpoints = []
-        self.build_track()
+        self._geometry = None
+        if geometry is None:
+            self.build_track()
+        else:
+            # Track loaded from arrays; segment objects are only made if asked for
+            self._segments = None
+            self._geometry = geometry
+            self.checkpoints = np.flatnonzero(geometry.checkpoint_mask).tolist()
+    
+    @property
+    def segments(self):
+        """TrackSegment list, created on first use for tracks built from geometry"""
+        if self._segments is None:
+            geometry = self._geometry
+            self._segments = [
+                TrackSegment(Vector3(*start), Vector3(*end), width)
+                for start, end, width in zip(geometry.starts.tolist(), geometry.ends.tolist(),
+                                             geometry.widths.tolist())
+            ]
+        return self._segments
+    
+    @segments.setter
+    def segments(self, segments):
+        self._segments = segments
     
     def build_track(self):
         """Build an exciting elevated track with various features"""
@@ -173,41 +589,95 @@ class Track:
         # Connect back to start
         points.append(Vector3(0, 0, 0))
         
+        self.set_points(points)
+    
+    def set_points(self, points, width=8):
+        """Replace the track with segments joining consecutive points"""
+        self.segments = []
+        self.checkpoints = []
+        
         # Create segments from points
         for i in range(len(points) - 1):
-            segment = TrackSegment(points[i], points[i + 1])
+            segment = TrackSegment(points[i], points[i + 1], width)
             self.segments.append(segment)
         
-        # Set up checkpoints (evenly spaced)
-        checkpoint_interval = len(self.segments) // 5
-        for i in range(0, len(self.segments), checkpoint_interval):
-            self.checkpoints.append(i)
+        self.invalidate_geometry()
+        
+        # Set up checkpoints (evenly spaced along the track's length)
+        geometry = self.geometry
+        for k in range(self.checkpoint_count):
+            distance = geometry.total_length * k / self.checkpoint_count
+            index = min(bisect_right(geometry.cumulative_lengths, distance), len(geometry)) - 1
+            if index not in self.checkpoints:
+                self.checkpoints.append(index)
+        checkpoint_mask = np.zeros(len(geometry), dtype=bool)
+        checkpoint_mask[self.checkpoints] = True
+        geometry.set_checkpoint_mask(checkpoint_mask)
+    
+    def invalidate_geometry(self):
+        """Drop the compiled geometry; call after editing segments or checkpoints"""
+        if self._segments is None:
+            self.segments = self.segments  # Keep the loaded layout as segment objects
+        self._geometry = None
+    
+    @property
+    def geometry(self):
+        """Compiled geometry buffers, rebuilt only after the track changes"""
+        if self._geometry is None:
+            self._geometry = TrackGeometry.from_segments(self.segments, self.checkpoints)
+        return self._geometry
     
     def get_position_on_track(self, progress):
-        """Get position and normal on track based on progress (0-1)"""
-        segment_index = int(progress * len(self.segments)) % len(self.segments)
-        segment = self.segments[segment_index]
-        
-        local_progress = (progress * len(self.segments)) % 1.0
-        
-        # Interpolate position
-        pos = Vector3(
-            segment.start.x + (segment.end.x - segment.start.x) * local_progress,
-            segment.start.y + (segment.end.y - segment.start.y) * local_progress,
-            segment.start.z + (segment.end.z - segment.start.z) * local_progress
-        )
-        
-        # Calculate track direction
-        dx = segment.end.x - segment.start.x
-        dz = segment.end.z - segment.start.z
-        angle = math.atan2(dx, dz)
+        """Get position and normal on track based on progress (0-1) of its true length"""
+        geometry = self.geometry
+        return geometry.position_at((progress % 1.0) * geometry.total_length)
+    
+    def get_positions_on_track(self, progress):
+        """Batched get_position_on_track for an array of progress values
         
-        return pos, angle, segment_index
+        Returns (positions (N, 3), angles (N,), segment_indices (N,)).
+        """
+        geometry = self.geometry
+        return geometry.positions_at((np.asarray(progress, dtype=float) % 1.0) * geometry.total_length)
+    
+    def checkpoint_crossed(self, previous, progress):
+        """Checkpoint segment passed moving from one progress value to another, or -1"""
+        return self.geometry.checkpoint_crossed(previous % 1.0, progress % 1.0)
+    
+    def checkpoints_crossed(self, previous, progress):
+        """Batched checkpoint_crossed for arrays of progress values"""
+        return self.geometry.checkpoints_crossed(np.asarray(previous) % 1.0, np.asarray(progress) % 1.0)
+    
+    def stream_to(self, progress):
+        """Prepare geometry around a progress value; the built-in track is always loaded"""
+
+# Car body corners in car space: bottom face, then top face
+CAR_LENGTH = 3
+CAR_WIDTH = 1.5
+CAR_BOX = [
+    Vector3(-CAR_WIDTH, 0, -CAR_LENGTH),
+    Vector3(CAR_WIDTH, 0, -CAR_LENGTH),
+    Vector3(CAR_WIDTH, 0, CAR_LENGTH),
+    Vector3(-CAR_WIDTH, 0, CAR_LENGTH),
+    Vector3(-CAR_WIDTH, 2, -CAR_LENGTH),
+    Vector3(CAR_WIDTH, 2, -CAR_LENGTH),
+    Vector3(CAR_WIDTH, 2, CAR_LENGTH),
+    Vector3(-CAR_WIDTH, 2, CAR_LENGTH)
+]
+CAR_BOX_ARRAY = np.array([tuple(corner) for corner in CAR_BOX])
+# Wireframe box as three polylines: bottom face, top face, then the vertical
+# edges, joined along top and bottom edges the faces already cover
+CAR_POLYLINES = (
+    np.array([0, 1, 2, 3, 0]),
+    np.array([4, 5, 6, 7, 4]),
+    np.array([0, 4, 5, 1, 2, 6, 7, 3]),
+)
 
 class Car:
     """Player's racing car with physics"""
-    def __init__(self, track):
+    def __init__(self, track, physics=None):
         self.track = track
+        self.physics = physics if physics is not None else PhysicsParams()
         self.progress = 0.0  # Position on track (0-1)
         self.position = Vector3(0, 0, 0)
         self.velocity = 0
@@ -220,38 +690,45 @@ class Car:
         self.lap_time = 0
         self.current_lap = 0
         self.last_checkpoint = -1
+        self.corners = [Vector3() for _ in CAR_BOX]
+        self.telemetry = None  # TelemetryBuffer that update() writes each tick into, if set
         
     def update(self, dt, controls):
         """Update car physics and position"""
+        physics = self.physics
+        
         # Handle acceleration and braking
         if controls['throttle']:
-            self.velocity += ACCELERATION
+            self.velocity += physics.acceleration
         if controls['brake']:
-            self.velocity -= BRAKE_FORCE
+            self.velocity -= physics.brake_force
         
         # Handle boost
         if controls['boost'] and self.boost_amount > 0 and self.on_ground:
-            self.velocity += BOOST_POWER
+            self.velocity += physics.boost_power
             self.boost_amount -= 1
         else:
             self.boost_amount = min(self.max_boost, self.boost_amount + self.boost_recharge_rate)
         
         # Apply friction and limits
         if self.on_ground:
-            self.velocity *= FRICTION
+            self.velocity *= physics.friction
         else:
-            self.velocity *= AIR_RESISTANCE
+            self.velocity *= physics.air_resistance
         
-        self.velocity = max(-MAX_SPEED / 2, min(MAX_SPEED, self.velocity))
+        max_speed = physics.max_speed
+        self.velocity = max(-max_speed / 2, min(max_speed, self.velocity))
         
         # Handle steering
+        previous_progress = self.progress
+        progress_scale = self.track.progress_scale
         if controls['left'] and abs(self.velocity) > 0.5:
-            self.progress -= TURN_SPEED * abs(self.velocity) / MAX_SPEED
+            self.progress -= physics.turn_speed * abs(self.velocity) / max_speed * progress_scale
         if controls['right'] and abs(self.velocity) > 0.5:
-            self.progress += TURN_SPEED * abs(self.velocity) / MAX_SPEED
+            self.progress += physics.turn_speed * abs(self.velocity) / max_speed * progress_scale
         
         # Update position on track
-        self.progress += self.velocity * 0.001
+        self.progress += self.velocity * 0.001 * progress_scale
         self.progress = self.progress % 1.0
         
         # Get track position and angle
@@ -261,7 +738,7 @@ class Car:
         # Check if on ground (simple collision detection)
         if self.position.y > track_pos.y + 0.5:
             self.on_ground = False
-            self.vertical_velocity -= GRAVITY * dt
+            self.vertical_velocity -= physics.gravity * dt
         else:
             self.on_ground = True
             self.position.y = track_pos.y
@@ -274,65 +751,97 @@ class Car:
         self.position.x = track_pos.x
         self.position.z = track_pos.z
         
-        # Check checkpoint
-        if segment_index in self.track.checkpoints:
-            if segment_index != self.last_checkpoint:
-                self.last_checkpoint = segment_index
-                # Check if completed lap
-                if segment_index == 0 and self.current_lap > 0:
-                    self.current_lap += 1
+        # Check checkpoint crossings along the distance moved this tick
+        checkpoint = self.track.checkpoint_crossed(previous_progress, self.progress)
+        if checkpoint != -1 and checkpoint != self.last_checkpoint:
+            self.last_checkpoint = checkpoint
+            # Check if completed lap
+            if checkpoint == 0 and self.current_lap > 0:
+                self.current_lap += 1
         
         # Update lap time
         self.lap_time += dt
+        
+        if self.telemetry is not None:
+            self.telemetry.record(self, segment_index)
     
     def get_corners(self):
-        """Get car corners for rendering"""
-        car_length = 3
-        car_width = 1.5
-        
-        corners = [
-            Vector3(-car_width, 0, -car_length),
-            Vector3(car_width, 0, -car_length),
-            Vector3(car_width, 0, car_length),
-            Vector3(-car_width, 0, car_length),
-            Vector3(-car_width, 2, -car_length),
-            Vector3(car_width, 2, -car_length),
-            Vector3(car_width, 2, car_length),
-            Vector3(-car_width, 2, car_length)
-        ]
-        
-        # Rotate and translate corners
-        cos_a = math.cos(self.angle)
-        sin_a = math.sin(self.angle)
-        
-        rotated = []
-        for corner in corners:
-            x = corner.x * cos_a - corner.z * sin_a + self.position.x
-            y = corner.y + self.position.y
-            z = corner.x * sin_a + corner.z * cos_a + self.position.z
-            rotated.append(Vector3(x, y, z))
-        
-        return rotated
+        """Get car corners for rendering; the same Vector3s are updated on every call"""
+        return rotate_y_translate(CAR_BOX, self.angle, self.position, self.corners)
+    
+    def save_state(self):
+        """Tuple of everything update() changes, to hand back to restore_state"""
+        position = self.position
+        return (position.x, position.y, position.z, self.progress, self.velocity, self.vertical_velocity,
+                self.angle, self.on_ground, self.boost_amount, self.lap_time, self.current_lap,
+                self.last_checkpoint)
+    
+    def restore_state(self, state):
+        """Put the car back in a state from save_state"""
+        (x, y, z, self.progress, self.velocity, self.vertical_velocity, self.angle, self.on_ground,
+         self.boost_amount, self.lap_time, self.current_lap, self.last_checkpoint) = state
+        self.position.set(x, y, z)
 
 class RacingGame:
     """Main game class"""
-    def __init__(self):
+    def __init__(self, profile_path=None, recorder=None, track=None, max_fps=FPS, opponents=0,
+                 telemetry_path=None):
+        init_display()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Stunt Car Racer - Wireframe Edition")
         self.clock = pygame.time.Clock()
         
         # Game objects
-        self.track = Track()
-        self.car = Car(self.track)
+        self.track = track if track is not None else Track()
+        # A recording is replayed with the physics it was recorded with, so the car must use them too
+        self.car = Car(self.track, recorder.physics if recorder is not None else None)
         self.camera = Camera()
         
+        # AI opponents advance together as a vectorized fleet
+        self.opponents = None
+        if opponents:
+            from racing_ai import make_opponents
+            self.opponents, self.driver = make_opponents(self.track, opponents, self.car.physics)
+            self.previous_opponents = (self.opponents.position.copy(), self.opponents.angle.copy())
+        
         # UI fonts
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
+        self.font = get_font(36)
+        self.small_font = get_font(24)
+        self.text_cache = TextCache()
+        self.render_queue = RenderQueue()  # Track and car lines, drawn together each frame
+        self._static_layer = None
+        self._static_layer_key = None
+        
+        # Frame profiling (F3 toggles the overlay; a trace is saved on exit if requested)
+        self.profile_path = profile_path
+        self.profiler = FrameProfiler(enabled=profile_path is not None)
+        self.profiler_font = get_font(20)
+        
+        # Input recording: controls are stored per tick against the recorder's fixed dt
+        self.recorder = recorder
+        
+        # Per-tick car telemetry: a .npz gets the buffered ticks on exit, while
+        # a .csv is streamed to disk from a background thread as the session runs
+        self.telemetry_path = telemetry_path
+        self.telemetry_flusher = None
+        if telemetry_path is not None:
+            self.car.telemetry = TelemetryBuffer()
+            if not str(telemetry_path).endswith('.npz'):
+                self.telemetry_flusher = TelemetryFlusher(self.car.telemetry, telemetry_path)
+        
+        # Physics runs at a fixed tick rate; frames are drawn at up to max_fps
+        # (0 for no limit) with the car interpolated between the last two ticks
+        self.timestep = FixedTimestep(recorder.dt if recorder is not None else 1.0 / FPS)
+        self.max_fps = max_fps
+        self.previous_pose = None
+        self.render_position = Vector3()
+        self.render_angle = 0.0
+        self.render_corners = [Vector3() for _ in CAR_BOX]  # Drawn car corners, apart from the car's own
         
         # Start position
         self.car.current_lap = 1
         self.start_time = time.time()
+        self.running = False
         
     def handle_input(self):
         """Handle keyboard input"""
@@ -350,85 +859,159 @@ class RacingGame:
     
     def update(self, dt):
         """Update game state"""
-        controls = self.handle_input()
-        self.car.update(dt, controls)
+        with self.profiler.scope('input'):
+            controls = self.handle_input()
+        if self.recorder is not None:
+            self.recorder.record(controls)
+        with self.profiler.scope('update'):
+            self.car.update(dt, controls)
+            self.track.stream_to(self.car.progress)
+        if self.opponents is not None:
+            with self.profiler.scope('ai'):
+                self.opponents.update(dt, self.driver(self.opponents))
         
-        # Update camera to follow car
-        self.camera.position.x = self.car.position.x
-        self.camera.position.y = self.car.position.y - 5
-        self.camera.position.z = self.car.position.z - 20
-        self.camera.rotation = self.car.angle
+        self.follow_car()
+    
+    def follow_car(self):
+        """Update camera to follow car"""
+        self.follow(self.car.position, self.car.angle)
+    
+    def follow(self, position, angle):
+        """Place the camera behind a car pose"""
+        self.camera.position.x = position.x
+        self.camera.position.y = position.y - 5
+        self.camera.position.z = position.z - 20
+        self.camera.rotation = angle
+    
+    def store_pose(self):
+        """Remember the car's pose before a tick, to interpolate the frames drawn after it"""
+        position = self.car.position
+        self.previous_pose = (position.x, position.y, position.z, self.car.angle)
+        if self.opponents is not None:
+            previous_position, previous_angle = self.previous_opponents
+            previous_position[:] = self.opponents.position
+            previous_angle[:] = self.opponents.angle
+    
+    def interpolate_pose(self, alpha):
+        """Set the drawn car and camera pose between the previous and current tick"""
+        car = self.car
+        if self.previous_pose is None:
+            self.render_position.set(car.position.x, car.position.y, car.position.z)
+            self.render_angle = car.angle
+        else:
+            x, y, z, angle = self.previous_pose
+            self.render_position.set(
+                x + (car.position.x - x) * alpha,
+                y + (car.position.y - y) * alpha,
+                z + (car.position.z - z) * alpha
+            )
+            # Turn the short way round
+            turn = (car.angle - angle + math.pi) % (2 * math.pi) - math.pi
+            self.render_angle = angle + turn * alpha
+        self.follow(self.render_position, self.render_angle)
     
     def draw_track(self):
-        """Render track with wireframe graphics"""
-        # Draw track segments
-        for i, segment in enumerate(self.track.segments):
-            corners = segment.get_corners()
-            projected = [self.camera.project(corner) for corner in corners]
-            
-            # Only draw if all points are visible
-            if all(p is not None for p in projected):
-                points_2d = [(p[0], p[1]) for p in projected]
-                
-                # Color based on distance
-                avg_z = sum(p[2] for p in projected) / len(projected)
-                brightness = max(50, min(255, int(255 - avg_z * 2)))
-                
-                # Highlight checkpoints
-                if i in self.track.checkpoints:
-                    color = (brightness, brightness // 2, brightness // 2)
-                else:
-                    color = (brightness, brightness, brightness)
-                
-                # Draw track surface
-                if len(points_2d) >= 3:
-                    pygame.draw.polygon(self.screen, color, points_2d, 1)
-                    
-                # Draw track edges
-                pygame.draw.line(self.screen, color, points_2d[0], points_2d[1], 2)
-                pygame.draw.line(self.screen, color, points_2d[2], points_2d[3], 2)
-                
-                # Draw support pillars for elevated sections
-                if segment.start.y > 2:
-                    for corner in [corners[0], corners[1]]:
-                        ground_point = Vector3(corner.x, 0, corner.z)
-                        proj_top = self.camera.project(corner)
-                        proj_bottom = self.camera.project(ground_point)
-                        if proj_top and proj_bottom:
-                            pygame.draw.line(self.screen, GRAY, 
-                                           (proj_top[0], proj_top[1]), 
-                                           (proj_bottom[0], proj_bottom[1]), 1)
+        """Queue the track's wireframe lines for this frame"""
+        geometry = self.track.geometry
+        queue = self.render_queue
+        
+        # Only touch segments near the camera and inside its view
+        candidates = geometry.grid.query_box(*self.camera.view_bounds())
+        visible_segments = candidates[self.camera.cull_segments(geometry.corners[candidates])]
+        count = len(visible_segments)
+        
+        # Project the visible corners, then their pillar bases, in a single call
+        points = np.concatenate((
+            geometry.corners[visible_segments].reshape(-1, 3),
+            geometry.pillar_bases[visible_segments].reshape(-1, 3)
+        ))
+        screen_x, screen_y, depth, visible = self.camera.project_points(points)
+        
+        # Only draw segments whose four corners are all visible
+        drawn = visible[:count * 4].reshape(count, 4).all(axis=1)
+        segments = visible_segments[drawn]
+        corner_x = screen_x[:count * 4].reshape(count, 4)[drawn]
+        corner_y = screen_y[:count * 4].reshape(count, 4)[drawn]
+        
+        # Color based on distance, with checkpoints highlighted
+        avg_z = depth[:count * 4].reshape(count, 4)[drawn].sum(axis=1) / 4
+        brightness = np.clip((255 - avg_z * 2).astype(int), 50, 255)
+        checkpoints = geometry.checkpoint_mask[segments]
+        tint = np.where(checkpoints, brightness // 2, brightness)
+        colors = np.stack((brightness, tint, tint), axis=1)
+        
+        # Distant segments are outlined thinly; nearby ones get double-width
+        # outlines and pillars
+        near = avg_z <= self.camera.lod_distance
+        
+        # Track surface outlines, one polyline per run of consecutive segments
+        # in the same color and detail whose edges meet on screen. Distant
+        # segments fade to the same color, so they form long runs. The polyline
+        # passes through each segment's corners in turn (start edge, right side,
+        # end edge), then comes back along the left sides
+        outlines = np.stack((corner_x, corner_y), axis=2)
+        joined = (np.abs(outlines[1:, [0, 1]] - outlines[:-1, [3, 2]]) < 0.5).all(axis=(1, 2))
+        breaks = ((np.diff(segments) != 1) | ~joined | (np.diff(brightness) != 0)
+                  | (np.diff(checkpoints) != 0) | (np.diff(near) != 0))
+        run_starts = np.flatnonzero(np.concatenate(([len(segments) > 0], breaks))).tolist()
+        run_colors = colors.tolist()
+        run_near = near.tolist()
+        for start, end in zip(run_starts, run_starts[1:] + [len(segments)]):
+            run = outlines[start:end]
+            points = np.concatenate((run.reshape(-1, 2), run[::-1, [3, 0]].reshape(-1, 2)))
+            queue.add_polyline(run_colors[start], points, 2 if run_near[start] else 1)
+        
+        # Support pillars for elevated sections
+        pillar_visible = visible[count * 4:].reshape(count, 2)[drawn]
+        pillars = (near & geometry.elevated[segments])[:, None] & pillar_visible
+        queue.add_lines(corner_x[:, :2][pillars], corner_y[:, :2][pillars],
+                        screen_x[count * 4:].reshape(count, 2)[drawn][pillars],
+                        screen_y[count * 4:].reshape(count, 2)[drawn][pillars], GRAY, 1)
     
     def draw_car(self):
-        """Render car with wireframe graphics"""
-        corners = self.car.get_corners()
+        """Queue the car's wireframe lines"""
+        corners = rotate_y_translate(CAR_BOX, self.render_angle, self.render_position, self.render_corners)
         projected = [self.camera.project(corner) for corner in corners]
         
         if all(p is not None for p in projected):
-            points = [(p[0], p[1]) for p in projected]
-            
-            # Draw car body edges (wireframe cube)
-            edges = [
-                (0, 1), (1, 2), (2, 3), (3, 0),  # Bottom face
-                (4, 5), (5, 6), (6, 7), (7, 4),  # Top face
-                (0, 4), (1, 5), (2, 6), (3, 7)   # Vertical edges
-            ]
-            
-            for edge in edges:
-                pygame.draw.line(self.screen, RED, points[edge[0]], points[edge[1]], 2)
+            points = np.array(projected)[:, :2]
             
-            # Draw front indicator
-            pygame.draw.line(self.screen, YELLOW, points[1], points[5], 3)
+            # Car body (wireframe cube), then the front indicator
+            for polyline in CAR_POLYLINES:
+                self.render_queue.add_polyline(RED, points[polyline], 2)
+            self.render_queue.add_line(YELLOW, points[1], points[5], 3)
+    
+    def draw_opponents(self, alpha):
+        """Queue the AI cars, interpolated between ticks like the player's car"""
+        fleet = self.opponents
+        previous_position, previous_angle = self.previous_opponents
+        positions = previous_position + (fleet.position - previous_position) * alpha
+        turn = (fleet.angle - previous_angle + math.pi) % (2 * math.pi) - math.pi
+        corners = rotate_y_translate_many(CAR_BOX_ARRAY, previous_angle + turn * alpha, positions)
+        
+        # Project every car's corners at once and draw the ones fully in view
+        screen_x, screen_y, _, visible = self.camera.project_points(corners.reshape(-1, 3))
+        shown = visible.reshape(-1, 8).all(axis=1)
+        screen_x = screen_x.reshape(-1, 8)[shown]
+        screen_y = screen_y.reshape(-1, 8)[shown]
+        queue = self.render_queue
+        points = np.stack((screen_x, screen_y), axis=2)
+        for polyline in CAR_POLYLINES:
+            for car_points in points[:, polyline]:
+                queue.add_polyline(GREEN, car_points, 2)
+        queue.add_lines(screen_x[:, 1], screen_y[:, 1], screen_x[:, 5], screen_y[:, 5], YELLOW, 3)
     
     def draw_ui(self):
         """Draw user interface"""
-        # Speed display
-        speed_text = self.font.render(f"Speed: {abs(self.car.velocity):.1f}", True, GREEN)
-        self.screen.blit(speed_text, (10, 10))
+        text_cache = self.text_cache
+        
+        # Speed display (label cached, value composed from cached glyphs)
+        label = text_cache.blit(self.screen, self.font, "Speed: ", GREEN, (10, 10))
+        text_cache.blit_glyphs(self.screen, self.font, f"{abs(self.car.velocity):.1f}", GREEN,
+                               (label.right, 10))
         
         # Boost meter
-        boost_text = self.small_font.render("Boost:", True, CYAN)
-        self.screen.blit(boost_text, (10, 50))
+        text_cache.blit(self.screen, self.small_font, "Boost:", CYAN, (10, 50))
         
         boost_bar_width = 200
         boost_bar_height = 20
@@ -441,71 +1024,141 @@ class RacingGame:
         elapsed = time.time() - self.start_time
         minutes = int(elapsed // 60)
         seconds = elapsed % 60
-        timer_text = self.font.render(f"Time: {minutes:02d}:{seconds:05.2f}", True, WHITE)
-        self.screen.blit(timer_text, (10, 85))
+        label = text_cache.blit(self.screen, self.font, "Time: ", WHITE, (10, 85))
+        text_cache.blit_glyphs(self.screen, self.font, f"{minutes:02d}:{seconds:05.2f}", WHITE,
+                               (label.right, 85))
         
         # Lap counter
-        lap_text = self.small_font.render(f"Lap: {self.car.current_lap}", True, WHITE)
-        self.screen.blit(lap_text, (10, 125))
+        text_cache.blit(self.screen, self.small_font, f"Lap: {self.car.current_lap}", WHITE, (10, 125))
         
         # On ground indicator
         status = "ON GROUND" if self.car.on_ground else "AIRBORNE!"
         status_color = GREEN if self.car.on_ground else YELLOW
-        status_text = self.small_font.render(status, True, status_color)
-        self.screen.blit(status_text, (10, 150))
-        
-        # Controls help
-        controls_lines = [
-            "Arrow Keys: Steer/Throttle/Brake",
-            "Space: Boost",
-            "ESC: Quit"
-        ]
-        
-        for i, line in enumerate(controls_lines):
-            text = self.small_font.render(line, True, WHITE)
-            self.screen.blit(text, (SCREEN_WIDTH - 280, SCREEN_HEIGHT - 80 + i * 25))
-        
-        # Title
-        title = self.font.render("STUNT CAR RACER", True, RED)
-        self.screen.blit(title, (SCREEN_WIDTH // 2 - 150, 10))
+        text_cache.blit(self.screen, self.small_font, status, status_color, (10, 150))
     
-    def draw(self):
-        """Render everything"""
-        self.screen.fill(BLACK)
+    def static_layer(self):
+        """Background, horizon, title and controls help, baked once per resolution"""
+        width, height = size = self.screen.get_size()
+        key = (size, self.camera.horizon)
+        if self._static_layer is None or self._static_layer_key != key:
+            layer = pygame.Surface(size).convert()  # Same pixel format as the display
+            layer.fill(BLACK)
+            
+            # Horizon line
+            pygame.draw.line(layer, BLUE, (0, self.camera.horizon), (width, self.camera.horizon), 1)
+            
+            # Controls help
+            controls_lines = [
+                "Arrow Keys: Steer/Throttle/Brake",
+                "Space: Boost",
+                "ESC: Quit"
+            ]
+            
+            for i, line in enumerate(controls_lines):
+                layer.blit(self.small_font.render(line, True, WHITE),
+                           (width - 280, height - 80 + i * 25))
+            
+            # Title
+            layer.blit(self.font.render("STUNT CAR RACER", True, RED), (width // 2 - 150, 10))
+            
+            self._static_layer = layer
+            self._static_layer_key = key
+        return self._static_layer
+    
+    def draw(self, alpha=1.0):
+        """Render everything, alpha of the way from the previous tick to the current one"""
+        self.interpolate_pose(alpha)
         
-        # Draw horizon line
-        pygame.draw.line(self.screen, BLUE, (0, self.camera.horizon), 
-                        (SCREEN_WIDTH, self.camera.horizon), 1)
+        # One blit replaces the clear and every static element
+        self.screen.blit(self.static_layer(), (0, 0))
         
         # Draw track and car
-        self.draw_track()
-        self.draw_car()
+        with self.profiler.scope('draw_track'):
+            self.draw_track()
+        with self.profiler.scope('draw_car'):
+            if self.opponents is not None:
+                self.draw_opponents(alpha)
+            self.draw_car()
+        with self.profiler.scope('rasterize'):
+            self.render_queue.flush(self.screen)
         
         # Draw UI
-        self.draw_ui()
+        with self.profiler.scope('draw_ui'):
+            self.draw_ui()
+            self.profiler.draw_overlay(self.screen, self.text_cache, self.profiler_font, YELLOW,
+                                       (SCREEN_WIDTH - 300, 50))
         
-        pygame.display.flip()
+        with self.profiler.scope('flip'):
+            pygame.display.flip()
     
     def run(self):
         """Main game loop"""
-        running = True
+        self.running = True
         
-        while running:
-            dt = self.clock.tick(FPS) / 1000.0
+        while self.running:
+            frame_time = self.clock.tick(self.max_fps) / 1000.0
+            self.profiler.begin_frame()
             
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        running = False
+            with self.profiler.scope('events'):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self.running = False
+                    elif event.type == pygame.KEYDOWN:
+                        self.handle_key(event.key)
             
-            self.update(dt)
-            self.draw()
+            timestep = self.timestep
+            for _ in range(timestep.advance(frame_time)):
+                self.store_pose()
+                self.update(timestep.dt)
+            self.draw(timestep.alpha)
+            self.profiler.end_frame()
+        
+        self.shutdown()
         
         pygame.quit()
         sys.exit()
+    
+    def handle_key(self, key):
+        """React to a single key press"""
+        if key == pygame.K_ESCAPE:
+            self.running = False
+        elif key == pygame.K_F3:
+            self.profiler.toggle_overlay()
+    
+    def shutdown(self):
+        """Save any requested traces and recordings before exiting"""
+        if self.profile_path and self.profiler.trace:
+            self.profiler.export(self.profile_path)
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.telemetry_flusher is not None:
+            self.telemetry_flusher.close()
+        elif self.telemetry_path is not None:
+            self.car.telemetry.export(self.telemetry_path)
 
 if __name__ == "__main__":
-    game = RacingGame()
+    parser = argparse.ArgumentParser(description="Stunt Car Racer - Wireframe Edition")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="record per-frame timings and save them to a .json or .csv trace")
+    parser.add_argument("--procedural", metavar="SEED", type=int,
+                        help="race an endless generated course built from SEED")
+    parser.add_argument("--track", metavar="PATH",
+                        help="race a track saved with track_file.py")
+    parser.add_argument("--opponents", type=int, default=0, metavar="N",
+                        help="race against N AI cars")
+    parser.add_argument("--max-fps", type=int, default=FPS,
+                        help=f"frame rate limit, 0 for none; physics always ticks at {FPS} Hz")
+    parser.add_argument("--telemetry", metavar="PATH",
+                        help="record the car's state every tick to a .npz or streamed .csv file")
+    args = parser.parse_args()
+    
+    track = None
+    if args.procedural is not None:
+        from track_generator import ProceduralTrack
+        track = ProceduralTrack(seed=args.procedural)
+    elif args.track:
+        from track_file import load_track
+        track = load_track(args.track)
+    game = RacingGame(profile_path=args.profile, track=track, max_fps=args.max_fps,
+                      opponents=args.opponents, telemetry_path=args.telemetry)
     game.run()
@@ -0,0 +1,193 @@
+"""Deterministic input recording and replay for the racing game
+
+Recordings store one control bitmask byte per tick against a fixed timestep,
+so a lap replays bit-for-bit, either headless or on screen:
+
+    python racing_replay.py record lap.scr     # play and record a session
+    python racing_replay.py play lap.scr       # watch it with seek and fast-forward
+    python racing_replay.py simulate lap.scr   # re-simulate headless and time it
+"""
+import argparse
+import json
+import struct
+import sys
+import time
+
+import pygame
+
+from racing_game import Car, PhysicsParams, RacingGame, Track
+from racing_sim import FIXED_DT, NO_CONTROLS, RacingSimulation, decode_controls, encode_controls
+
+MAGIC = b'SCRR'
+VERSION = 2  # Version 2: progress is measured along the track's arc length
+# magic, version, fixed timestep, tick count, metadata length
+HEADER = struct.Struct('<4sHdII')
+
+
+class InputRecorder:
+    """Collects one control bitmask per tick and writes them to a replay file"""
+    def __init__(self, path=None, dt=FIXED_DT, physics=None):
+        self.path = path
+        self.dt = dt
+        self.physics = physics if physics is not None else PhysicsParams()
+        self.masks = bytearray()
+
+    def record(self, controls):
+        self.masks.append(encode_controls(controls))
+
+    def replay(self):
+        return Replay(bytes(self.masks), self.dt, self.physics.as_dict())
+
+    def close(self):
+        if self.path is not None:
+            self.replay().save(self.path)
+
+
+class ReplayControls:
+    """Control policy that feeds a replay's masks back tick by tick"""
+    def __init__(self, masks):
+        self.masks = masks
+
+    def __call__(self, tick, car):
+        if tick < len(self.masks):
+            return decode_controls(self.masks[tick])
+        return NO_CONTROLS
+
+
+class Replay:
+    """A recorded control stream plus the timestep and physics it was recorded with"""
+    def __init__(self, masks, dt=FIXED_DT, physics=None):
+        self.masks = masks
+        self.dt = dt
+        self.physics = physics or {}
+
+    def __len__(self):
+        return len(self.masks)
+
+    def save(self, path):
+        metadata = json.dumps({'physics': self.physics}).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.dt, len(self.masks), len(metadata)))
+            f.write(metadata)
+            f.write(self.masks)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, dt, ticks, metadata_length = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a racing replay file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        offset = HEADER.size
+        metadata = json.loads(data[offset:offset + metadata_length].decode('utf-8'))
+        offset += metadata_length
+        masks = data[offset:offset + ticks]
+        if len(masks) != ticks:
+            raise ValueError(f"{path} is truncated")
+        return cls(masks, dt, metadata.get('physics'))
+
+    def policy(self):
+        return ReplayControls(self.masks)
+
+    def make_car(self, track):
+        car = Car(track, PhysicsParams(**self.physics))
+        car.current_lap = 1  # Same starting lap as RacingGame
+        return car
+
+    def simulate(self, track=None):
+        """Re-simulate the whole recording headless; returns the finished RacingSimulation"""
+        sim = RacingSimulation(track, policy=self.policy(), dt=self.dt,
+                               physics=PhysicsParams(**self.physics))
+        sim.run(len(self.masks))
+        return sim
+
+
+class ReplayViewer(RacingGame):
+    """Renders a replay with pause, fast-forward, rewind and restart
+
+    SPACE pauses, hold RIGHT to fast-forward, hold LEFT to rewind and HOME
+    restarts. The car's state is saved every KEYFRAME_TICKS ticks as playback
+    reaches them; seeking restores the nearest keyframe before the target and
+    re-simulates the rest, which is exact because the recording is
+    deterministic.
+    """
+    FAST_FORWARD = 8
+    REWIND_TICKS = 8
+    KEYFRAME_TICKS = 60
+
+    def __init__(self, replay):
+        super().__init__()
+        self.replay = replay
+        self.timestep.dt = replay.dt  # Play back one recorded tick per simulation tick
+        self.controls = replay.policy()
+        self.car = replay.make_car(self.track)
+        self.keyframes = [self.car.save_state()]  # State at every KEYFRAME_TICKS-th tick
+        self.tick = 0
+        self.paused = False
+        self.seek(0)
+
+    def advance(self, ticks):
+        """Simulate up to `ticks` recorded ticks, saving keyframes along the way"""
+        for _ in range(min(ticks, len(self.replay) - self.tick)):
+            self.car.update(self.replay.dt, self.controls(self.tick, self.car))
+            self.tick += 1
+            if self.tick == len(self.keyframes) * self.KEYFRAME_TICKS:
+                self.keyframes.append(self.car.save_state())
+
+    def seek(self, tick):
+        """Jump to a tick by re-simulating from the nearest keyframe before it"""
+        tick = max(0, min(len(self.replay), tick))
+        keyframe = min(tick // self.KEYFRAME_TICKS, len(self.keyframes) - 1)
+        self.car.restore_state(self.keyframes[keyframe])
+        self.tick = keyframe * self.KEYFRAME_TICKS
+        self.advance(tick - self.tick)
+        self.follow_car()
+        self.store_pose()  # Jump straight to the new pose instead of sweeping to it
+
+    def handle_key(self, key):
+        if key == pygame.K_SPACE:
+            self.paused = not self.paused
+        elif key == pygame.K_HOME:
+            self.seek(0)
+        else:
+            super().handle_key(key)
+
+    def update(self, dt):
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_LEFT]:
+            self.seek(self.tick - self.REWIND_TICKS)
+            return
+
+        steps = 0 if self.paused else (self.FAST_FORWARD if keys[pygame.K_RIGHT] else 1)
+        self.advance(steps)
+        self.follow_car()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay racing sessions")
+    parser.add_argument('mode', choices=('record', 'play', 'simulate'))
+    parser.add_argument('path')
+    args = parser.parse_args(argv)
+
+    if args.mode == 'record':
+        RacingGame(recorder=InputRecorder(args.path)).run()
+    elif args.mode == 'play':
+        ReplayViewer(Replay.load(args.path)).run()
+    else:
+        replay = Replay.load(args.path)
+        track = Track()
+        start = time.perf_counter()
+        sim = replay.simulate(track)
+        elapsed = time.perf_counter() - start
+        recorded = len(replay) * replay.dt
+        print(f"{len(replay)} ticks ({recorded:.1f}s of play) re-simulated in {elapsed * 1000:.1f} ms "
+              f"({recorded / max(elapsed, 1e-9):,.0f}x real time)")
+        best = f"{min(sim.lap_times):.2f}s" if sim.lap_times else "n/a"
+        print(f"Laps completed: {len(sim.lap_times)}  Best lap: {best}  "
+              f"Final progress: {sim.car.progress:.6f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import sys
+import time
+
+from racing_game import FPS, Car, Track
+
+# Fixed simulation timestep, matching one frame of the interactive game
+FIXED_DT = 1.0 / FPS
+
+CONTROL_NAMES = ('throttle', 'brake', 'left', 'right', 'boost')
+
+
+def make_controls(**pressed):
+    """Build a controls dict like RacingGame.handle_input, defaulting to released"""
+    return {name: bool(pressed.get(name, False)) for name in CONTROL_NAMES}
+
+
+# Bit assigned to each control in a packed per-tick control mask
+CONTROL_BITS = {name: 1 << i for i, name in enumerate(CONTROL_NAMES)}
+
+# Every possible mask decoded once, so decoding never allocates
+_DECODED = tuple(
+    {name: bool(mask & bit) for name, bit in CONTROL_BITS.items()}
+    for mask in range(1 << len(CONTROL_NAMES))
+)
+
+
+def encode_controls(controls):
+    """Pack a controls dict into a small integer bitmask"""
+    mask = 0
+    for name, bit in CONTROL_BITS.items():
+        if controls[name]:
+            mask |= bit
+    return mask
+
+
+def decode_controls(mask):
+    """Unpack a bitmask into a shared, read-only controls dict"""
+    return _DECODED[mask]
+
+
+NO_CONTROLS = make_controls()
+THROTTLE = make_controls(throttle=True)
+THROTTLE_BOOST = make_controls(throttle=True, boost=True)
+
+
+# Control policies take (tick, car) and return a controls dict. They live at
+# module level so they can be handed to worker processes.
+
+def idle(tick, car):
+    """Release every control"""
+    return NO_CONTROLS
+
+
+def full_throttle(tick, car):
+    """Hold the throttle down for the whole run"""
+    return THROTTLE
+
+
+def throttle_and_boost(tick, car):
+    """Hold the throttle and fire the boost whenever it is available"""
+    return THROTTLE_BOOST
+
+
+class RecordedControls:
+    """Policy that plays back a recorded sequence of controls dicts"""
+    def __init__(self, sequence, loop=False):
+        self.sequence = list(sequence)
+        self.loop = loop
+
+    def __call__(self, tick, car):
+        if self.loop and self.sequence:
+            return self.sequence[tick % len(self.sequence)]
+        if tick < len(self.sequence):
+            return self.sequence[tick]
+        return NO_CONTROLS
+
+
+class RacingSimulation:
+    """Steps a Track and Car at a fixed timestep with no window or wall-clock sleeps"""
+    def __init__(self, track=None, policy=full_throttle, dt=FIXED_DT, physics=None):
+        self.track = track if track is not None else Track()
+        self.car = Car(self.track, physics)
+        self.car.current_lap = 1  # Same starting lap as RacingGame
+        self.policy = policy
+        self.dt = dt
+        self.tick = 0
+        self.lap_times = []
+        self.airborne_ticks = 0
+        self.longest_airborne_ticks = 0
+        self._airborne_streak = 0
+        self._lap_start_tick = 0
+
+    def step(self, controls=None):
+        """Advance one tick using the given controls, or the policy if None"""
+        if controls is None:
+            controls = self.policy(self.tick, self.car)
+        lap = self.car.current_lap
+        started = self.car.last_checkpoint != -1
+        self.car.update(self.dt, controls)
+        self.tick += 1
+
+        if not self.car.on_ground:
+            self.airborne_ticks += 1
+            self._airborne_streak += 1
+            self.longest_airborne_ticks = max(self.longest_airborne_ticks, self._airborne_streak)
+        else:
+            self._airborne_streak = 0
+        if self.car.current_lap != lap:
+            # Car counts the first pass over the start line as a lap; skip it
+            if started:
+                self.lap_times.append((self.tick - self._lap_start_tick) * self.dt)
+            self._lap_start_tick = self.tick
+
+    def run(self, ticks):
+        """Advance a fixed number of ticks"""
+        for _ in range(ticks):
+            self.step()
+
+    def run_laps(self, laps, max_ticks=None):
+        """Advance until `laps` more laps are completed or max_ticks elapse
+
+        Returns the lap times (in simulated seconds) completed during this call.
+        """
+        completed = len(self.lap_times)
+        target = completed + laps
+        limit = None if max_ticks is None else self.tick + max_ticks
+        while len(self.lap_times) < target:
+            if limit is not None and self.tick >= limit:
+                break
+            self.step()
+        return self.lap_times[completed:]
+
+
+def main(laps=1000):
+    sim = RacingSimulation()
+    start = time.perf_counter()
+    lap_times = sim.run_laps(laps)
+    elapsed = time.perf_counter() - start
+
+    print(f"Simulated {len(lap_times)} laps in {elapsed:.2f}s "
+          f"({len(lap_times) / elapsed:.0f} laps/s, {sim.tick / elapsed:.0f} ticks/s)")
+    if lap_times:
+        print(f"Best lap: {min(lap_times):.2f}s  Mean lap: {sum(lap_times) / len(lap_times):.2f}s")
+    print(f"Airborne: {sim.airborne_ticks / max(1, sim.tick):.1%} of ticks")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,86 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from racing_game import PhysicsParams, Track
+import racing_sim
+
+# Each worker process builds the default track once and reuses it
+_track = None
+
+
+def _worker_track():
+    global _track
+    if _track is None:
+        _track = Track()
+    return _track
+
+
+def parameter_grid(grid):
+    """Expand {name: [values]} into one {name: value} dict per combination"""
+    names = sorted(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def run_trial(params, policy, laps=5, max_ticks=20000):
+    """Run one headless simulation with its own physics parameters
+
+    Returns a dict of lap times and airborne statistics. Runs in a worker
+    process, so params and policy must be picklable.
+    """
+    sim = racing_sim.RacingSimulation(
+        _worker_track(), policy=policy, physics=PhysicsParams(**params)
+    )
+    lap_times = sim.run_laps(laps, max_ticks=max_ticks)
+    return {
+        'params': params,
+        'policy': getattr(policy, '__name__', type(policy).__name__),
+        'lap_times': lap_times,
+        'best_lap': min(lap_times) if lap_times else None,
+        'mean_lap': sum(lap_times) / len(lap_times) if lap_times else None,
+        'ticks': sim.tick,
+        'airborne_fraction': sim.airborne_ticks / max(1, sim.tick),
+        'longest_airborne': sim.longest_airborne_ticks * sim.dt,
+    }
+
+
+def sweep(grid, policies, laps=5, max_ticks=20000, workers=None):
+    """Run every parameter combination against every policy across a process pool
+
+    Yields result dicts from run_trial as soon as each simulation finishes, in
+    completion order. workers defaults to every core on the machine.
+    """
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(run_trial, params, policy, laps, max_ticks)
+            for params in parameter_grid(grid)
+            for policy in policies
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main():
+    grid = {
+        'acceleration': [0.2, 0.3, 0.4],
+        'max_speed': [12, 15, 18],
+        'gravity': [0.2, 0.3, 0.4],
+    }
+    policies = [racing_sim.full_throttle, racing_sim.throttle_and_boost]
+
+    start = time.perf_counter()
+    results = []
+    for result in sweep(grid, policies):
+        results.append(result)
+        best = result['best_lap']
+        best_text = f"{best:6.2f}s" if best is not None else "   n/a "
+        print(f"{result['policy']:20s} {result['params']}  best {best_text}  "
+              f"airborne {result['airborne_fraction']:.0%}")
+    elapsed = time.perf_counter() - start
+    print(f"{len(results)} simulations in {elapsed:.2f}s on {os.cpu_count()} cores")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Batched line and polyline submission for the wireframe renderer
+
+The renderer builds each frame's lines as arrays, with no per-segment Python
+work, and queues them in a RenderQueue. Runs of connected lines in one color
+are queued as polylines, so flush() draws each run with a single
+pygame.draw.lines call; the remaining loose lines are drawn one by one from
+plain lists, so no color tuple or point is built per line in Python.
+"""
+import numpy as np
+import pygame
+
+
+class RenderQueue:
+    """Lines and polylines submitted during a frame, drawn together by flush()
+
+    Submit arrays of line ends with add_lines (one color per line or one for
+    all), single lines with add_line, or the points of a connected run with
+    add_polyline. flush() draws from thinnest to widest, polylines before
+    lines of the same width, keeping submission order otherwise.
+    """
+    def __init__(self):
+        self.lines = []
+        self.polylines = []
+
+    def add_lines(self, x0, y0, x1, y1, color, width=1):
+        x0 = np.asarray(x0, dtype=float).ravel()
+        if not len(x0):
+            return
+        colors = np.broadcast_to(np.asarray(color, dtype=int), (len(x0), 3))
+        self.lines.append((width, x0, np.asarray(y0, dtype=float).ravel(),
+                           np.asarray(x1, dtype=float).ravel(), np.asarray(y1, dtype=float).ravel(), colors))
+
+    def add_line(self, color, start, end, width=1):
+        self.add_lines((start[0],), (start[1],), (end[0],), (end[1],), color, width)
+
+    def add_polyline(self, color, points, width=1):
+        """Queue the lines joining consecutive (x, y) points, drawn with one call"""
+        if len(points) > 1:
+            self.polylines.append((width, color, points))
+
+    def __len__(self):
+        return sum(len(batch[1]) for batch in self.lines) + sum(len(batch[2]) - 1 for batch in self.polylines)
+
+    def clear(self):
+        self.lines = []
+        self.polylines = []
+
+    def flush(self, surface):
+        """Draw and clear everything queued"""
+        draw_lines = pygame.draw.lines
+        draw_line = pygame.draw.line
+        for width in sorted({batch[0] for batch in self.polylines} | {batch[0] for batch in self.lines}):
+            for polyline_width, color, points in self.polylines:
+                if polyline_width == width:
+                    draw_lines(surface, color, False, np.asarray(points).tolist(), width)
+            for line_width, x0, y0, x1, y1, colors in self.lines:
+                if line_width != width:
+                    continue
+                for start_x, start_y, end_x, end_y, color in zip(x0.tolist(), y0.tolist(), x1.tolist(),
+                                                                   y1.tolist(), colors.tolist()):
+                    draw_line(surface, color, (start_x, start_y), (end_x, end_y), width)
+        self.clear()
@@ -0,0 +1,127 @@
+"""Per-tick car telemetry for tuning
+
+TelemetryBuffer is a fixed-size ring of the last `capacity` ticks of car
+state, allocated once up front. Car.update writes one row into it per tick
+when car.telemetry is set, with no per-tick allocations. The buffer exports
+its contents to a columnar .npz or a .csv file. TelemetryFlusher streams new
+rows to a CSV file from a background thread, so whole sessions can be kept
+however long they run.
+"""
+import csv
+import threading
+from array import array
+
+import numpy as np
+
+FIELDS = ('progress', 'velocity', 'vertical_velocity', 'on_ground', 'boost_amount', 'segment_index')
+FIELD_COUNT = len(FIELDS)
+INTEGER_FIELDS = ('on_ground', 'segment_index')
+CAPACITY = 1 << 16  # About 18 minutes at 60 ticks per second
+
+
+class TelemetryBuffer:
+    """Ring buffer holding one row of FIELDS per tick
+
+    count is the number of ticks recorded so far; only the newest `capacity`
+    of them are still held.
+    """
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        # Rows are written through a flat array.array, which takes Python floats
+        # without boxing them into NumPy scalars; rows is a NumPy view of it
+        self._values = array('d', bytes(capacity * FIELD_COUNT * 8))
+        self.rows = np.frombuffer(self._values, dtype=float).reshape(capacity, FIELD_COUNT)
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def record(self, car, segment_index):
+        """Store the car's state after a tick"""
+        base = (self.count % self.capacity) * FIELD_COUNT
+        values = self._values
+        values[base] = car.progress
+        values[base + 1] = car.velocity
+        values[base + 2] = car.vertical_velocity
+        values[base + 3] = car.on_ground
+        values[base + 4] = car.boost_amount
+        values[base + 5] = segment_index
+        self.count += 1  # Only after the row is complete, for readers on other threads
+
+    def snapshot(self, start=0):
+        """Copy of the rows from tick `start` (or the oldest still held) to the newest
+
+        Returns (first tick, rows). Safe to call from another thread while the
+        car keeps recording; rows overwritten during the copy are dropped.
+        """
+        end = self.count
+        start = max(start, end - self.capacity)
+        rows = self.rows[np.arange(start, end) % self.capacity]
+        overwritten = self.count - self.capacity - start
+        if overwritten > 0:
+            rows = rows[overwritten:]
+            start += overwritten
+        return start, rows
+
+    def columns(self, start=0):
+        """Dict of tick and field arrays, oldest first"""
+        first, rows = self.snapshot(start)
+        columns = {'tick': np.arange(first, first + len(rows))}
+        for i, name in enumerate(FIELDS):
+            column = rows[:, i]
+            columns[name] = column.astype(int) if name in INTEGER_FIELDS else column
+        return columns
+
+    def export(self, path):
+        """Write the held ticks to a columnar .npz or a .csv file"""
+        columns = self.columns()
+        if str(path).endswith('.npz'):
+            np.savez(path, **columns)
+        else:
+            with open(path, 'w', newline='') as f:
+                write_csv_rows(csv.writer(f), columns, header=True)
+
+
+def write_csv_rows(writer, columns, header=False):
+    if header:
+        writer.writerow(list(columns))
+    writer.writerows(zip(*(column.tolist() for column in columns.values())))
+
+
+class TelemetryFlusher:
+    """Background thread appending new telemetry rows to a CSV file every `interval` seconds
+
+    Ticks overwritten before the thread reached them are counted in
+    `dropped`. close() stops the thread and writes the remaining rows.
+    """
+    def __init__(self, telemetry, path, interval=1.0):
+        self.telemetry = telemetry
+        self.interval = interval
+        self.flushed = 0
+        self.dropped = 0
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(('tick',) + FIELDS)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='telemetry-flusher', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        columns = self.telemetry.columns(self.flushed)
+        ticks = columns['tick']
+        if not len(ticks):
+            return
+        self.dropped += int(ticks[0]) - self.flushed
+        write_csv_rows(self._writer, columns)
+        self._file.flush()
+        self.flushed = int(ticks[-1]) + 1
+
+    def close(self):
+        self._stopping.set()
+        self._thread.join()
+        self.flush()
+        self._file.close()
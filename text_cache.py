@@ -0,0 +1,57 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by font, string and color
+
+    Static labels are rendered once with render(); frequently changing
+    readouts such as speed or timers are composed from cached per-glyph
+    surfaces with blit_glyphs(), so steady-state frames never rasterize text.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """Return a surface for text, rendering it only on a cache miss"""
+        key = (font, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def blit(self, screen, font, text, color, position):
+        """Blit a cached rendering of text and return the covered rect"""
+        return screen.blit(self.render(font, text, color), position)
+
+    def blit_glyphs(self, screen, font, text, color, position):
+        """Blit text one cached glyph at a time and return the covered rect
+
+        Meant for numeric readouts: only a handful of distinct glyphs exist,
+        so every value is drawn without rendering a new surface.
+        """
+        x, y = position
+        left = x
+        height = 0
+        for char in text:
+            glyph = self.render(font, char, color)
+            screen.blit(glyph, (x, y))
+            x += glyph.get_width()
+            height = max(height, glyph.get_height())
+        return (left, y, x - left, height)
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def __len__(self):
+        return len(self._surfaces)
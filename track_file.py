@@ -0,0 +1,116 @@
+"""Compact binary track files, loaded by memory-mapping them into TrackGeometry
+
+Layout (little-endian): a 16-byte header, then the centre-line points as
+float32 (segments + 1, 3), segment widths as float32 (segments,) and one
+checkpoint byte per segment. Version 2 files follow these, from the next
+8-byte boundary, with the geometry the renderer and physics need: the
+arc-length table as float64 (segments + 1,) and the corner and pillar base
+buffer as float32 (segments * 6, 3).
+
+The loader wraps every region as a read-only array view without copying.
+A large track opens immediately, and processes that map the same file
+share the pages of its biggest arrays. Anything else a caller uses (segment
+directions and lengths, and for version 1 files the stored arrays too) is
+built in each process on first use.
+
+    python track_file.py export track.sct   # save the built-in track
+    python track_file.py info track.sct     # load a file and describe it
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from racing_game import Track, TrackGeometry
+
+MAGIC = b'SCRT'
+VERSION = 2  # Version 2 adds the arc-length table and the render points
+# magic, version, flags (unused), segment count, padding to keep the arrays aligned
+HEADER = np.dtype([('magic', 'S4'), ('version', '<u2'), ('flags', '<u2'),
+                   ('segments', '<u4'), ('padding', '<u4')])
+
+
+def save_track(track, path):
+    """Write a track's geometry to path; its segments must join end to start"""
+    geometry = track.geometry
+    if len(geometry) and not np.array_equal(geometry.ends[:-1], geometry.starts[1:]):
+        raise ValueError("Track segments must form a connected chain to be saved")
+
+    header = np.zeros(1, dtype=HEADER)
+    header['magic'] = MAGIC
+    header['version'] = VERSION
+    header['segments'] = len(geometry)
+    points = np.concatenate((geometry.starts, geometry.ends[-1:])).astype('<f4')
+    widths = geometry.widths.astype('<f4')
+    # Derive the stored tables from the float32 values a loader will see
+    stored = TrackGeometry(points[:-1], points[1:], widths, geometry.checkpoint_mask)
+    with open(path, 'wb') as f:
+        f.write(header.tobytes())
+        f.write(points.tobytes())
+        f.write(widths.tobytes())
+        f.write(geometry.checkpoint_mask.astype(np.uint8).tobytes())
+        f.write(bytes(-f.tell() % 8))
+        f.write(stored.cumulative_lengths.astype('<f8').tobytes())
+        f.write(stored.points.astype('<f4').tobytes())
+
+
+def load_geometry(path):
+    """Memory-map a track file into a TrackGeometry without copying its arrays"""
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+    if len(data) < HEADER.itemsize:
+        raise ValueError(f"{path} is not a track file")
+    header = data[:HEADER.itemsize].view(HEADER)[0]
+    if header['magic'] != MAGIC:
+        raise ValueError(f"{path} is not a track file")
+    version = int(header['version'])
+    if version not in (1, VERSION):
+        raise ValueError(f"Unsupported track file version {version}")
+
+    count = int(header['segments'])
+    offset = HEADER.itemsize
+    points_end = offset + (count + 1) * 12
+    widths_end = points_end + count * 4
+    mask_end = widths_end + count
+    cumulative_start = mask_end + (-mask_end % 8)
+    cumulative_end = cumulative_start + (count + 1) * 8
+    end = cumulative_end + count * 6 * 12 if version >= 2 else mask_end
+    if len(data) < end:
+        raise ValueError(f"{path} is truncated")
+
+    points = data[offset:points_end].view('<f4').reshape(-1, 3)
+    widths = data[points_end:widths_end].view('<f4')
+    checkpoint_mask = data[widths_end:mask_end].view(bool)
+    if version == 1:
+        return TrackGeometry(points[:-1], points[1:], widths, checkpoint_mask)
+    cumulative_lengths = data[cumulative_start:cumulative_end].view('<f8')
+    render_points = data[cumulative_end:end].view('<f4').reshape(-1, 3)
+    return TrackGeometry(points[:-1], points[1:], widths, checkpoint_mask,
+                         points=render_points, cumulative_lengths=cumulative_lengths)
+
+
+def load_track(path):
+    """Track backed by a memory-mapped track file"""
+    return Track(load_geometry(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export and inspect binary track files")
+    parser.add_argument('mode', choices=('export', 'info'))
+    parser.add_argument('path')
+    args = parser.parse_args(argv)
+
+    if args.mode == 'export':
+        track = Track()
+        save_track(track, args.path)
+        print(f"Saved {len(track.geometry)} segments to {args.path}")
+    else:
+        start = time.perf_counter()
+        geometry = load_geometry(args.path)
+        elapsed = time.perf_counter() - start
+        print(f"{args.path}: {len(geometry)} segments, {geometry.total_length:.1f} units long, "
+              f"{int(geometry.checkpoint_mask.sum())} checkpoints, loaded in {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Seeded procedural tracks that stream in chunks around the car
+
+Every chunk starts and ends on the centre line at BASE_HEIGHT, so chunk k
+always begins at z = k * CHUNK_LENGTH and can be generated on its own from
+(seed, k). Only a small window of chunks is kept in memory, so memory use and
+startup time do not depend on how long the course is.
+"""
+import math
+import random
+from collections import OrderedDict
+
+import numpy as np
+
+from racing_game import TrackGeometry, interpolate_segments
+
+BASE_HEIGHT = 3
+FEATURE_SEGMENTS = 8
+FEATURE_LENGTH = 48
+FEATURES_PER_CHUNK = 4
+SEGMENTS_PER_CHUNK = FEATURE_SEGMENTS * FEATURES_PER_CHUNK
+CHUNK_LENGTH = FEATURE_LENGTH * FEATURES_PER_CHUNK
+TRACK_WIDTH = 8
+
+# World distance covered per unit of progress on the built-in track, used to
+# keep car speed on procedural courses comparable to it
+REFERENCE_LENGTH = 620.0
+
+
+# Each feature returns FEATURE_SEGMENTS (x, y, dz) steps that start and end at
+# x = 0, y = BASE_HEIGHT, and whose dz values add up to FEATURE_LENGTH.
+
+def straight(rng):
+    return [(0.0, BASE_HEIGHT, 6.0)] * FEATURE_SEGMENTS
+
+
+def hill(rng):
+    height = rng.uniform(4, 10)
+    return [(0.0, BASE_HEIGHT + height * math.sin(math.pi * k / FEATURE_SEGMENTS), 6.0)
+            for k in range(1, FEATURE_SEGMENTS + 1)]
+
+
+def banked_turn(rng):
+    sweep = rng.uniform(10, 25) * rng.choice((-1, 1))
+    bank = rng.uniform(1, 3)
+    steps = []
+    for k in range(1, FEATURE_SEGMENTS + 1):
+        angle = 2 * math.pi * k / FEATURE_SEGMENTS
+        steps.append((sweep * math.sin(angle), BASE_HEIGHT + bank * abs(math.sin(angle)), 6.0))
+    return steps
+
+
+def ramp_jump(rng):
+    height = rng.uniform(6, 12)
+    landing = height * 0.4
+    steps = [(0.0, BASE_HEIGHT + height * k / 4, 6.0) for k in range(1, 5)]
+    steps.append((0.0, BASE_HEIGHT + landing, 12.0))  # The jump itself
+    steps.extend((0.0, BASE_HEIGHT + landing * (1 - k / 3), 4.0) for k in range(1, 4))
+    return steps
+
+
+def elevated(rng):
+    height = rng.uniform(4, 8)
+    profile = (0.5, 1, 1, 1, 1, 1, 0.5, 0)
+    return [(0.0, BASE_HEIGHT + height * level, 6.0) for level in profile]
+
+
+FEATURES = (straight, hill, banked_turn, ramp_jump, elevated)
+
+
+def generate_chunk_points(seed, index):
+    """Centre-line points (SEGMENTS_PER_CHUNK + 1, 3) of chunk `index`"""
+    rng = random.Random(seed * 1000003 + index)
+    z = index * CHUNK_LENGTH
+    points = [(0.0, BASE_HEIGHT, z)]
+    for _ in range(FEATURES_PER_CHUNK):
+        for x, y, dz in rng.choice(FEATURES)(rng):
+            z += dz
+            points.append((x, y, z))
+    return np.array(points)
+
+
+class ProceduralTrack:
+    """Very long seeded course generated lazily in chunks ahead of the car
+
+    Offers the same interface Car, CarFleet and RacingGame use on Track.
+    Progress 0-1 spans all chunk_count chunks. geometry holds only the window
+    of chunks around the last stream_to() call, and other chunks are generated
+    on demand into a small LRU cache.
+    """
+    def __init__(self, seed=0, chunk_count=100000, chunks_ahead=3, chunks_behind=1, cache_size=64):
+        self.seed = seed
+        self.chunk_count = chunk_count
+        self.chunks_ahead = chunks_ahead
+        self.chunks_behind = chunks_behind
+        self.cache_size = max(cache_size, chunks_ahead + chunks_behind + 1)
+        self.progress_scale = REFERENCE_LENGTH / (chunk_count * CHUNK_LENGTH)
+        self._chunks = OrderedDict()
+        self._window = None
+        self._geometry = None
+        self._tables = None
+        self.stream_to(0.0)
+
+    def chunk(self, index):
+        """Compiled geometry of one chunk, generated on first use"""
+        geometry = self._chunks.get(index)
+        if geometry is not None:
+            self._chunks.move_to_end(index)
+            return geometry
+
+        points = generate_chunk_points(self.seed, index)
+        checkpoint_mask = np.zeros(SEGMENTS_PER_CHUNK, dtype=bool)
+        checkpoint_mask[0] = True  # One checkpoint at the start of every chunk
+        geometry = TrackGeometry(points[:-1], points[1:], np.full(SEGMENTS_PER_CHUNK, TRACK_WIDTH),
+                                 checkpoint_mask)
+        self._chunks[index] = geometry
+        if len(self._chunks) > self.cache_size:
+            self._chunks.popitem(last=False)
+        return geometry
+
+    def chunk_index(self, progress):
+        return min(int((progress % 1.0) * self.chunk_count), self.chunk_count - 1)
+
+    def stream_to(self, progress):
+        """Load the chunks around progress and drop the rest from the render window"""
+        focus = self.chunk_index(progress)
+        window = (max(0, focus - self.chunks_behind), min(self.chunk_count - 1, focus + self.chunks_ahead))
+        if window != self._window:
+            self._window = window
+            self._geometry = None
+
+    @property
+    def geometry(self):
+        """Combined geometry of the chunks in the current window"""
+        if self._geometry is None:
+            chunks = [self.chunk(i) for i in range(self._window[0], self._window[1] + 1)]
+            self._geometry = TrackGeometry(
+                np.concatenate([c.starts for c in chunks]),
+                np.concatenate([c.ends for c in chunks]),
+                np.concatenate([c.widths for c in chunks]),
+                np.concatenate([c.checkpoint_mask for c in chunks])
+            )
+        return self._geometry
+
+    def get_position_on_track(self, progress):
+        """Get position, heading and global segment index based on progress (0-1)"""
+        scaled = (progress % 1.0) * self.chunk_count
+        index = min(int(scaled), self.chunk_count - 1)
+        chunk = self.chunk(index)
+        pos, angle, local_index = chunk.position_at((scaled - index) * chunk.total_length)
+        return pos, angle, index * SEGMENTS_PER_CHUNK + local_index
+
+    def get_positions_on_track(self, progress):
+        """Batched get_position_on_track, for cars spread over any number of chunks"""
+        scaled = (np.asarray(progress, dtype=float) % 1.0) * self.chunk_count
+        indices = np.minimum(scaled.astype(int), self.chunk_count - 1)
+        chunk_indices, rank = np.unique(indices, return_inverse=True)
+        cumulative, starts, ends = self.chunk_tables(chunk_indices)
+        
+        # Each car's arc-length table is the row of its own chunk; counting the
+        # entries at or below its distance is the same search position_at does
+        cumulative = cumulative[rank]
+        distances = (scaled - indices) * cumulative[:, -1]
+        local = np.minimum((cumulative <= distances[:, None]).sum(axis=1), SEGMENTS_PER_CHUNK) - 1
+        rows = rank * SEGMENTS_PER_CHUNK + local
+        positions, angles = interpolate_segments(
+            starts[rows], ends[rows], distances - cumulative[np.arange(len(local)), local]
+        )
+        return positions, angles, indices * SEGMENTS_PER_CHUNK + local
+    
+    def chunk_tables(self, chunk_indices):
+        """Stacked arc-length tables, starts and ends of the given chunks
+        
+        The tables for the last set of chunks asked for are kept, since cars
+        stay in the same few chunks for many ticks.
+        """
+        key = chunk_indices.tobytes()
+        if self._tables is None or self._tables[0] != key:
+            chunks = [self.chunk(index) for index in chunk_indices.tolist()]
+            self._tables = (key, np.stack([chunk.cumulative_lengths for chunk in chunks]),
+                            np.concatenate([chunk.starts for chunk in chunks]),
+                            np.concatenate([chunk.ends for chunk in chunks]))
+        return self._tables[1:]
+    
+    def checkpoint_crossed(self, previous, progress):
+        """Chunk-start checkpoint passed moving from previous to progress, or -1"""
+        crossed = self.checkpoints_crossed(np.array([previous]), np.array([progress]))
+        return int(crossed[0])
+    
+    def checkpoints_crossed(self, previous, progress):
+        """Batched checkpoint_crossed; every chunk starts at a multiple of 1 / chunk_count"""
+        count = self.chunk_count
+        previous = np.asarray(previous, dtype=float) % 1.0
+        progress = np.asarray(progress, dtype=float) % 1.0
+        ahead = (progress - previous) % 1.0
+        forward = ahead < 0.5
+        chunk = np.where(forward, np.floor(progress * count), np.ceil(progress * count)).astype(int) % count
+        start = chunk / count
+        crossed = np.where(forward, (start - previous) % 1.0 <= ahead,
+                           (previous - start) % 1.0 <= (previous - progress) % 1.0)
+        return np.where(crossed, chunk * SEGMENTS_PER_CHUNK, -1)
@@ -0,0 +1,75 @@
+"""Vector and transform helpers for the racing game's 3D maths
+
+Vector3 uses __slots__, and set() lets per-frame code update existing
+vectors instead of allocating new ones. rotate_y_translate writes into
+vectors the caller owns; rotate_y_translate_many places one (N, 3) model at
+many poses in one call.
+"""
+import math
+
+import numpy as np
+
+
+class Vector3:
+    """Simple 3D vector class"""
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x=0, y=0, z=0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def copy(self):
+        return Vector3(self.x, self.y, self.z)
+
+    def add(self, other):
+        return Vector3(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def scale(self, scalar):
+        return Vector3(self.x * scalar, self.y * scalar, self.z * scalar)
+
+    def set(self, x, y, z):
+        """Overwrite all three components; returns self"""
+        self.x = x
+        self.y = y
+        self.z = z
+        return self
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+        yield self.z
+
+    def __repr__(self):
+        return f"Vector3({self.x!r}, {self.y!r}, {self.z!r})"
+
+
+def rotate_y_translate(points, angle, offset, out):
+    """Rotate Vector3 points about the y axis, then add offset, writing into the out vectors"""
+    cos_a = math.cos(angle)
+    sin_a = math.sin(angle)
+    offset_x, offset_y, offset_z = offset.x, offset.y, offset.z
+    for point, target in zip(points, out):
+        x = point.x
+        z = point.z
+        target.x = x * cos_a - z * sin_a + offset_x
+        target.y = point.y + offset_y
+        target.z = x * sin_a + z * cos_a + offset_z
+    return out
+
+
+def rotate_y_translate_many(points, angles, offsets, out=None):
+    """Place one (N, 3) model at many poses; returns (M, N, 3) for M angles and offsets"""
+    points = np.asarray(points, dtype=float)
+    angles = np.asarray(angles, dtype=float)
+    if out is None:
+        out = np.empty((len(angles),) + points.shape)
+    cos_a = np.cos(angles)[:, None]
+    sin_a = np.sin(angles)[:, None]
+    x = points[:, 0]
+    z = points[:, 2]
+    out[:, :, 0] = x * cos_a - z * sin_a
+    out[:, :, 1] = points[:, 1]
+    out[:, :, 2] = x * sin_a + z * cos_a
+    out += np.asarray(offsets, dtype=float)[:, None, :]
+    return out